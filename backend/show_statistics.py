@@ -3,54 +3,85 @@ Display statistics for generated parking data
 """
 
 import json
+import math
 from collections import Counter
 
-# Load data
-with open('parking_slots_all.json', 'r') as f:
-    data = json.load(f)
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
-# Combine all slots
-all_slots = []
-for city_slots in data.values():
-    all_slots.extend(city_slots)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def iter_city_slots(path):
+    """Yield (city, slots) pairs, streaming one city at a time when ijson is available."""
+    with open(path, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.kvitems(f, '', use_float=True)
+        elif orjson is not None:
+            yield from orjson.loads(f.read()).items()
+        else:
+            yield from json.load(f).items()
+
+
+# Aggregate everything in a single pass over the slots
+city_counts = {}
+type_ctr = Counter()
+status_ctr = Counter()
+ev_count = 0
+handicap_count = 0
+total = 0
+price_sum = 0.0
+min_price = math.inf
+max_price = -math.inf
+
+for city, city_slots in iter_city_slots('parking_slots_all.json'):
+    city_counts[city] = len(city_slots)
+    for s in city_slots:
+        type_ctr[s['type']] += 1
+        status_ctr[s['status']] += 1
+        ev_count += s['isEVCharging']
+        handicap_count += s['isHandicap']
+        price = s['pricePerHour']
+        price_sum += price
+        min_price = price if price < min_price else min_price
+        max_price = price if price > max_price else max_price
+    total += len(city_slots)
 
 print("=" * 60)
 print("Parking Data Statistics")
 print("=" * 60)
 print()
 
-print(f"Total Slots: {len(all_slots):,}")
+print(f"Total Slots: {total:,}")
 print()
 
 print("By City:")
-for city, slots in sorted(data.items()):
-    print(f"  {city:15s}: {len(slots):,}")
+for city, count in sorted(city_counts.items()):
+    print(f"  {city:15s}: {count:,}")
 print()
 
 print("By Type:")
-types = Counter(s['type'] for s in all_slots)
-for t, c in types.most_common():
-    percentage = c / len(all_slots) * 100
+for t, c in type_ctr.most_common():
+    percentage = c / total * 100
     print(f"  {t:15s}: {c:,} ({percentage:.1f}%)")
 print()
 
 print("By Status:")
-statuses = Counter(s['status'] for s in all_slots)
-for st, c in statuses.most_common():
-    percentage = c / len(all_slots) * 100
+for st, c in status_ctr.most_common():
+    percentage = c / total * 100
     print(f"  {st:15s}: {c:,} ({percentage:.1f}%)")
 print()
 
-ev_count = sum(1 for s in all_slots if s["isEVCharging"])
-handicap_count = sum(1 for s in all_slots if s["isHandicap"])
-
-print(f"EV Charging Slots: {ev_count:,} ({ev_count/len(all_slots)*100:.1f}%)")
-print(f"Handicap Slots: {handicap_count:,} ({handicap_count/len(all_slots)*100:.1f}%)")
+print(f"EV Charging Slots: {ev_count:,} ({ev_count/total*100:.1f}%)")
+print(f"Handicap Slots: {handicap_count:,} ({handicap_count/total*100:.1f}%)")
 print()
 
-avg_price = sum(s["pricePerHour"] for s in all_slots) / len(all_slots)
-min_price = min(s["pricePerHour"] for s in all_slots)
-max_price = max(s["pricePerHour"] for s in all_slots)
+avg_price = price_sum / total
 
 print(f"Average Price/Hour: ₹{avg_price:.2f}")
 print(f"Min Price/Hour: ₹{min_price:.2f}")
@@ -58,11 +89,10 @@ print(f"Max Price/Hour: ₹{max_price:.2f}")
 print()
 
 print("By Area Type:")
-area_types = Counter(s['type'] for s in all_slots)
-print(f"  Commercial/Street: {sum(c for t, c in area_types.items() if t in ['commercial', 'street']):,}")
-print(f"  Residential: {area_types['residential']:,}")
-print(f"  Mall: {area_types['mall']:,}")
-print(f"  Airport: {area_types['airport']:,}")
+print(f"  Commercial/Street: {sum(c for t, c in type_ctr.items() if t in ['commercial', 'street']):,}")
+print(f"  Residential: {type_ctr['residential']:,}")
+print(f"  Mall: {type_ctr['mall']:,}")
+print(f"  Airport: {type_ctr['airport']:,}")
 print()
 
 print("=" * 60)
@@ -10,18 +10,108 @@ from flask_cors import CORS
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import joblib
+from functools import lru_cache
+from itertools import chain
+from typing import NamedTuple
+import logging
+import logging.handlers
+import math
 import os
+import sys
+import threading
+import time
 import traceback
 
+from config import ENABLE_CACHE, CACHE_TTL
+from serving_utils import bucket, use_orjson
+from compiled_model import load_compiled_classifier
+from model_store import AVAILABILITY_COMPRESSION, load_model_file
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: run the plain Python function."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    from ciso8601 import parse_datetime as parse_timestamp
+except ImportError:
+    if sys.version_info >= (3, 11):
+        # fromisoformat accepts a trailing 'Z' natively from 3.11 on
+        parse_timestamp = datetime.fromisoformat
+    else:
+        def parse_timestamp(value):
+            """Parse an ISO 8601 timestamp, accepting a trailing 'Z'."""
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
 
 app = Flask(__name__)
 CORS(app)
+use_orjson(app)
 
 # Load models
 AVAILABILITY_MODEL_PATH = 'parking_availability_model.pkl'
+AVAILABILITY_COMPILED_MODEL_PATH = 'parking_availability_model.so'  # optional, see compiled_model.py
 availability_model = None
 
+CATEGORICAL_FEATURES = ('city', 'area', 'parking_type', 'season', 'time_category')
+
+# Request error logging: rotating file, rate limited so a flood of bad
+# requests can't turn traceback formatting and writes into the bottleneck
+ERROR_LOG_FILE = 'availability_api_errors.log'
+ERROR_LOG_RATE = 10  # records per second
+ERROR_LOG_BURST = 50
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket: pass up to `rate` records per second, bursting to `burst`."""
+    
+    def __init__(self, rate, burst):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def filter(self, record):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+log = logging.getLogger('availability_api')
+_error_handler = logging.handlers.RotatingFileHandler(
+    ERROR_LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=3, delay=True)
+_error_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+_error_handler.addFilter(RateLimitFilter(ERROR_LOG_RATE, ERROR_LOG_BURST))
+log.addHandler(_error_handler)
+
+# Angular step per unit for the cyclical hour / day-of-week / month encodings
+_TAU_24 = 2 * math.pi / 24
+_TAU_7 = 2 * math.pi / 7
+_TAU_12 = 2 * math.pi / 12
+
+# Integer parking type codes for the compiled occupancy kernel
+PARKING_TYPE_CODES = {'mall': 0, 'commercial': 1, 'airport': 2, 'residential': 3, 'street': 4}
+_DEFAULT_PARKING_TYPE_CODE = PARKING_TYPE_CODES['street']
+
+# Per-thread feature buffers reused across requests
+_buffers = threading.local()
+
+# Response cache (enabled via config.ENABLE_CACHE); price and nearby-slot
+# inputs are rounded to this step to form the cache key
+PREDICTION_CACHE_SIZE = 65536
+CACHE_BUCKET_STEP = 5
+
 
 def load_availability_model():
     """Load the availability prediction model."""
@@ -33,15 +123,37 @@ def load_availability_model():
         return False
     
     try:
-        model_data = joblib.load(AVAILABILITY_MODEL_PATH)
+        # Memory-mapped read-only unless LZ4-compressed (see model_store)
+        model_data = load_model_file(AVAILABILITY_MODEL_PATH, AVAILABILITY_COMPRESSION)
+        # Prefer the Treelite-compiled model when present and up to date
+        compiled = load_compiled_classifier(AVAILABILITY_COMPILED_MODEL_PATH,
+                                            AVAILABILITY_MODEL_PATH,
+                                            len(model_data['feature_columns']))
         availability_model = {
-            'predictor': model_data['model'],
+            'predictor': compiled if compiled is not None else model_data['model'],
             'label_encoders': model_data['label_encoders'],
             'feature_columns': model_data['feature_columns'],
-            'metadata': model_data.get('metadata', {})
+            'metadata': model_data.get('metadata', {}),
+            # Column position of each feature, so rows can be written directly
+            'feature_index': {
+                name: i for i, name in enumerate(model_data['feature_columns'])
+            },
+            # Only models trained before the simulated occupancy feature was
+            # dropped need it computed per request
+            'uses_occupancy': 'historical_occupancy' in model_data['feature_columns'],
+            # Category -> code lookups, avoiding le.transform on the hot path.
+            # Keys are plain str (classes_ may hold np.str_) and codes plain int.
+            'encoder_maps': {
+                name: {str(cls): i for i, cls in enumerate(le.classes_)}
+                for name, le in model_data['label_encoders'].items()
+            }
         }
         
+        _predict_cached.cache_clear()
+        
         print(f"✓ Availability model loaded successfully")
+        if compiled is not None:
+            print(f"✓ Using compiled model: {AVAILABILITY_COMPILED_MODEL_PATH}")
         print(f"✓ Test Accuracy: {availability_model['metadata'].get('performance_metrics', {}).get('test_accuracy', 'unknown')}")
         
         return True
@@ -51,73 +163,319 @@ def load_availability_model():
         return False
 
 
+class TimeFeatures(NamedTuple):
+    """Time-based features of one timestamp, named after the training columns."""
+    hour: int
+    day_of_week: int
+    day_of_month: int
+    month: int
+    is_weekend: int
+    is_peak_morning: int
+    is_peak_evening: int
+    is_peak_hour: int
+    is_business_hours: int
+    is_night: int
+    season: str
+    time_category: str
+
+
 def extract_time_features(timestamp):
     """Extract time-based features from timestamp."""
+    hour = timestamp.hour
+    day_of_week = timestamp.weekday()
+    month = timestamp.month
+    is_peak_morning = 7 <= hour <= 10
+    is_peak_evening = 17 <= hour <= 20
+    return TimeFeatures(
+        hour=hour,
+        day_of_week=day_of_week,
+        day_of_month=timestamp.day,
+        month=month,
+        is_weekend=int(day_of_week >= 5),
+        is_peak_morning=int(is_peak_morning),
+        is_peak_evening=int(is_peak_evening),
+        is_peak_hour=int(is_peak_morning or is_peak_evening),
+        is_business_hours=int(9 <= hour <= 18),
+        is_night=int(hour >= 22 or hour <= 5),
+        season=get_season(month),
+        time_category=get_time_category(hour)
+    )
+
+
+# Season by month (index 0 unused) and time category by hour
+_SEASONS = (None,
+            'winter', 'winter', 'spring', 'spring', 'spring', 'summer',
+            'summer', 'summer', 'fall', 'fall', 'fall', 'winter')
+_TIME_CATEGORIES = tuple(
+    'late_night' if hour < 6 else
+    'morning' if hour < 12 else
+    'afternoon' if hour < 17 else
+    'evening' if hour < 21 else
+    'night'
+    for hour in range(24)
+)
+_DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def parse_timestamp_batch(values):
+    """
+    Parse a batch of ISO timestamps with a single pd.to_datetime call.
+    
+    Missing or empty values mean now. Returns a DatetimeIndex, or a list of
+    datetimes if pandas cannot represent the batch in one timezone (mixed
+    UTC offsets); either way each timestamp keeps its own wall-clock time,
+    as on the single-prediction path.
+    """
+    now = datetime.now().isoformat()
+    strings = [value or now for value in values]
+    try:
+        timestamps = pd.to_datetime(strings, format='ISO8601')
+    except ValueError:
+        timestamps = None
+    if not isinstance(timestamps, pd.DatetimeIndex):
+        timestamps = [parse_timestamp(value) for value in strings]
+    return timestamps
+
+
+def extract_time_feature_columns(timestamps):
+    """Vectorized extract_time_features: one array per TimeFeatures field."""
+    if isinstance(timestamps, pd.DatetimeIndex):
+        hour = timestamps.hour.to_numpy()
+        day_of_week = timestamps.dayofweek.to_numpy()
+        day_of_month = timestamps.day.to_numpy()
+        month = timestamps.month.to_numpy()
+    else:
+        hour = np.array([t.hour for t in timestamps])
+        day_of_week = np.array([t.weekday() for t in timestamps])
+        day_of_month = np.array([t.day for t in timestamps])
+        month = np.array([t.month for t in timestamps])
+    
+    is_peak_morning = (hour >= 7) & (hour <= 10)
+    is_peak_evening = (hour >= 17) & (hour <= 20)
     return {
-        'hour': timestamp.hour,
-        'day_of_week': timestamp.weekday(),
-        'day_of_month': timestamp.day,
-        'month': timestamp.month,
-        'is_weekend': int(timestamp.weekday() >= 5),
-        'is_peak_morning': int(7 <= timestamp.hour <= 10),
-        'is_peak_evening': int(17 <= timestamp.hour <= 20),
-        'is_peak_hour': int((7 <= timestamp.hour <= 10) or (17 <= timestamp.hour <= 20)),
-        'is_business_hours': int(9 <= timestamp.hour <= 18),
-        'is_night': int(timestamp.hour >= 22 or timestamp.hour <= 5),
-        'season': get_season(timestamp.month),
-        'time_category': get_time_category(timestamp.hour)
+        'hour': hour,
+        'day_of_week': day_of_week,
+        'day_of_month': day_of_month,
+        'month': month,
+        'is_weekend': (day_of_week >= 5).astype(np.int8),
+        'is_peak_morning': is_peak_morning.astype(np.int8),
+        'is_peak_evening': is_peak_evening.astype(np.int8),
+        'is_peak_hour': (is_peak_morning | is_peak_evening).astype(np.int8),
+        'is_business_hours': ((hour >= 9) & (hour <= 18)).astype(np.int8),
+        'is_night': ((hour >= 22) | (hour <= 5)).astype(np.int8),
+        'season': [_SEASONS[m] for m in month],
+        'time_category': [_TIME_CATEGORIES[h] for h in hour]
     }
 
 
 def get_season(month):
     """Get season from month."""
-    if month in [12, 1, 2]:
-        return 'winter'
-    elif month in [3, 4, 5]:
-        return 'spring'
-    elif month in [6, 7, 8]:
-        return 'summer'
-    else:
-        return 'fall'
+    return _SEASONS[month]
 
 
 def get_time_category(hour):
     """Categorize time of day."""
-    if 0 <= hour < 6:
-        return 'late_night'
-    elif 6 <= hour < 12:
-        return 'morning'
-    elif 12 <= hour < 17:
-        return 'afternoon'
-    elif 17 <= hour < 21:
-        return 'evening'
-    else:
-        return 'night'
+    return _TIME_CATEGORIES[hour]
 
 
-def simulate_occupancy(features):
-    """Simulate historical occupancy based on features."""
+def _feature_buffer(n_rows, n_cols):
+    """
+    Return a zeroed (n_rows, n_cols) float32 view of this thread's buffer.
+    
+    The buffer is grown geometrically for larger batches and reallocated if
+    the feature count changes (e.g. a different model was loaded).
+    """
+    buf = getattr(_buffers, 'matrix', None)
+    if buf is None or buf.shape[1] != n_cols:
+        buf = np.zeros((n_rows, n_cols), dtype=np.float32)
+        _buffers.matrix = buf
+    elif buf.shape[0] < n_rows:
+        buf = np.zeros((max(n_rows, buf.shape[0] * 2), n_cols), dtype=np.float32)
+        _buffers.matrix = buf
+    X = buf[:n_rows]
+    X.fill(0)
+    return X
+
+
+def build_feature_row(time_features, features):
+    """
+    Assemble a single model input row in training column order.
+    
+    Writes straight into this thread's NumPy buffer instead of going through
+    a one-row DataFrame; unseen categories fall back to code 0 as before.
+    
+    Args:
+        time_features: TimeFeatures for the requested timestamp
+        features: Dict of the remaining (location/slot) features
+    """
+    feature_index = availability_model['feature_index']
+    encoder_maps = availability_model['encoder_maps']
+    X = _feature_buffer(1, len(feature_index))
+    row = X[0]
+    
+    for name, value in chain(zip(TimeFeatures._fields, time_features), features.items()):
+        if name in CATEGORICAL_FEATURES:
+            value = encoder_maps[name].get(str(value), 0)
+            name = name + '_encoded'
+        idx = feature_index.get(name)
+        if idx is not None:
+            row[idx] = value
+    
+    # Cyclical features (plain floats, no ufunc dispatch for a single row)
+    hour_angle = time_features.hour * _TAU_24
+    dow_angle = time_features.day_of_week * _TAU_7
+    month_angle = time_features.month * _TAU_12
+    cyclical = {
+        'hour_sin': math.sin(hour_angle),
+        'hour_cos': math.cos(hour_angle),
+        'dow_sin': math.sin(dow_angle),
+        'dow_cos': math.cos(dow_angle),
+        'month_sin': math.sin(month_angle),
+        'month_cos': math.cos(month_angle)
+    }
+    for name, value in cyclical.items():
+        idx = feature_index.get(name)
+        if idx is not None:
+            row[idx] = value
+    
+    return X
+
+
+def build_feature_matrix(time_columns, feature_rows):
+    """
+    Assemble an (N, F) model input matrix for a batch.
+    
+    Columns are filled one at a time and the cyclical features are computed
+    on whole arrays, so the batch is scored with a single model call.
+    
+    Args:
+        time_columns: Dict of time feature columns from extract_time_feature_columns
+        feature_rows: List of location/slot feature dicts, one per row
+    """
+    feature_index = availability_model['feature_index']
+    encoder_maps = availability_model['encoder_maps']
+    X = _feature_buffer(len(feature_rows), len(feature_index))
+    
+    slot_columns = {name: [f[name] for f in feature_rows] for name in feature_rows[0]}
+    
+    for name, values in chain(time_columns.items(), slot_columns.items()):
+        if name in CATEGORICAL_FEATURES:
+            idx = feature_index.get(name + '_encoded')
+            if idx is not None:
+                codes = encoder_maps[name]
+                X[:, idx] = [codes.get(str(v), 0) for v in values]
+        else:
+            idx = feature_index.get(name)
+            if idx is not None:
+                X[:, idx] = values
+    
+    # Cyclical features
+    hour_angles = time_columns['hour'] * _TAU_24
+    dow_angles = time_columns['day_of_week'] * _TAU_7
+    month_angles = time_columns['month'] * _TAU_12
+    cyclical = {
+        'hour_sin': np.sin(hour_angles),
+        'hour_cos': np.cos(hour_angles),
+        'dow_sin': np.sin(dow_angles),
+        'dow_cos': np.cos(dow_angles),
+        'month_sin': np.sin(month_angles),
+        'month_cos': np.cos(month_angles)
+    }
+    for name, values in cyclical.items():
+        idx = feature_index.get(name)
+        if idx is not None:
+            X[:, idx] = values
+    
+    return X
+
+
+@njit(cache=True)
+def _occupancy(is_peak, is_business, is_weekend, is_night, ptype, noise):
+    """Occupancy rule on scalar flags and an integer parking type code."""
     base_occupancy = 0.5
     
-    if features['is_peak_hour']:
+    if is_peak:
         base_occupancy += 0.3
     
-    if features['is_business_hours']:
+    if is_business:
         base_occupancy += 0.15
     
-    if features['is_weekend']:
-        if features['parking_type'] == 'mall':
+    if is_weekend:
+        if ptype == 0:  # mall
             base_occupancy += 0.2
-        elif features['parking_type'] == 'commercial':
+        elif ptype == 1:  # commercial
             base_occupancy -= 0.2
     
-    if features['parking_type'] == 'airport':
+    if ptype == 2:  # airport
         base_occupancy += 0.25
-    elif features['parking_type'] == 'residential':
-        if features['is_night']:
-            base_occupancy += 0.3
+    elif ptype == 3 and is_night:  # residential
+        base_occupancy += 0.3
+    
+    occupancy = base_occupancy + noise
+    return 0.0 if occupancy < 0 else (1.0 if occupancy > 1 else occupancy)
+
+
+@njit(cache=True)
+def _occupancy_batch(flags, noise):
+    """Apply the occupancy rule to an (N, 5) flag matrix."""
+    out = np.empty(flags.shape[0])
+    for i in range(flags.shape[0]):
+        out[i] = _occupancy(flags[i, 0], flags[i, 1], flags[i, 2], flags[i, 3],
+                            flags[i, 4], noise[i])
+    return out
+
+
+def _occupancy_flags(time_features, parking_type):
+    return (
+        time_features.is_peak_hour,
+        time_features.is_business_hours,
+        time_features.is_weekend,
+        time_features.is_night,
+        PARKING_TYPE_CODES.get(parking_type, _DEFAULT_PARKING_TYPE_CODE)
+    )
+
+
+def simulate_occupancy(time_features, parking_type):
+    """Simulate historical occupancy based on features."""
+    return _occupancy(*_occupancy_flags(time_features, parking_type), np.random.normal(0, 0.05))
+
+
+def simulate_occupancy_batch(time_columns, parking_types):
+    """Simulate historical occupancy for a batch, drawing all noise at once."""
+    flags = np.column_stack([
+        time_columns['is_peak_hour'],
+        time_columns['is_business_hours'],
+        time_columns['is_weekend'],
+        time_columns['is_night'],
+        [PARKING_TYPE_CODES.get(p, _DEFAULT_PARKING_TYPE_CODE) for p in parking_types]
+    ]).astype(np.int64)
+    noise = np.random.normal(0, 0.05, size=len(parking_types))
+    return _occupancy_batch(flags, noise)
+
+
+@lru_cache(maxsize=PREDICTION_CACHE_SIZE)
+def _predict_cached(time_features, city, area, parking_type, is_ev_charging, is_handicap,
+                    price_bucket, nearby_bucket, ttl_window):
+    """
+    Cached (occupied, available) probabilities for a discretized request.
     
-    return min(max(base_occupancy + np.random.normal(0, 0.05), 0), 1)
+    ttl_window is only part of the key, so entries age out every CACHE_TTL
+    seconds. The simulated occupancy noise is drawn once per entry.
+    """
+    features = {
+        'city': city,
+        'area': area,
+        'parking_type': parking_type,
+        'is_ev_charging': is_ev_charging,
+        'is_handicap': is_handicap,
+        'price_per_hour': price_bucket,
+        'nearby_slots_count': nearby_bucket
+    }
+    if availability_model['uses_occupancy']:
+        features['historical_occupancy'] = simulate_occupancy(time_features, parking_type)
+    probability = availability_model['predictor'].predict_proba(
+        build_feature_row(time_features, features))[0]
+    return float(probability[0]), float(probability[1])
 
 
 @app.route('/health', methods=['GET'])
@@ -157,57 +515,48 @@ def predict_availability():
         data = request.get_json()
         
         # Parse timestamp
-        if 'timestamp' in data and data['timestamp']:
-            timestamp = datetime.fromisoformat(data['timestamp'].replace('Z', '+00:00'))
+        if data.get('timestamp'):
+            timestamp = parse_timestamp(data['timestamp'])
         else:
             timestamp = datetime.now()
         
         # Extract time features
-        features = extract_time_features(timestamp)
-        
-        # Add location features
-        features['city'] = data.get('city', 'Unknown')
-        features['area'] = data.get('area', 'Unknown')
-        features['parking_type'] = data.get('parking_type', 'street')
-        features['is_ev_charging'] = int(data.get('is_ev_charging', False))
-        features['is_handicap'] = int(data.get('is_handicap', False))
-        features['price_per_hour'] = float(data.get('price_per_hour', 20.0))
-        features['nearby_slots_count'] = int(data.get('nearby_slots_count', 10))
-        features['historical_occupancy'] = simulate_occupancy(features)
-        
-        # Prepare DataFrame
-        X = pd.DataFrame([features])
-        
-        # Encode categorical features
-        categorical_features = ['city', 'area', 'parking_type', 'season', 'time_category']
-        
-        for feature in categorical_features:
-            if feature in X.columns:
-                le = availability_model['label_encoders'][feature]
-                try:
-                    X[feature + '_encoded'] = le.transform(X[feature].astype(str))
-                except ValueError:
-                    X[feature + '_encoded'] = 0
-                X = X.drop(feature, axis=1)
+        time_features = extract_time_features(timestamp)
         
-        # Create cyclical features
-        X['hour_sin'] = np.sin(2 * np.pi * X['hour'] / 24)
-        X['hour_cos'] = np.cos(2 * np.pi * X['hour'] / 24)
-        X['dow_sin'] = np.sin(2 * np.pi * X['day_of_week'] / 7)
-        X['dow_cos'] = np.cos(2 * np.pi * X['day_of_week'] / 7)
-        X['month_sin'] = np.sin(2 * np.pi * X['month'] / 12)
-        X['month_cos'] = np.cos(2 * np.pi * X['month'] / 12)
-        
-        # Ensure same features as training
-        for col in availability_model['feature_columns']:
-            if col not in X.columns:
-                X[col] = 0
+        # Location features
+        features = {
+            'city': data.get('city', 'Unknown'),
+            'area': data.get('area', 'Unknown'),
+            'parking_type': data.get('parking_type', 'street'),
+            'is_ev_charging': int(data.get('is_ev_charging', False)),
+            'is_handicap': int(data.get('is_handicap', False)),
+            'price_per_hour': float(data.get('price_per_hour', 20.0)),
+            'nearby_slots_count': int(data.get('nearby_slots_count', 10))
+        }
         
-        X = X[availability_model['feature_columns']]
+        if ENABLE_CACHE:
+            probability = _predict_cached(
+                time_features,
+                str(features['city']),
+                str(features['area']),
+                str(features['parking_type']),
+                features['is_ev_charging'],
+                features['is_handicap'],
+                bucket(features['price_per_hour'], CACHE_BUCKET_STEP),
+                bucket(features['nearby_slots_count'], CACHE_BUCKET_STEP),
+                int(time.time() // CACHE_TTL)
+            )
+        else:
+            if availability_model['uses_occupancy']:
+                features['historical_occupancy'] = simulate_occupancy(time_features, features['parking_type'])
+            
+            # Prepare model input
+            X = build_feature_row(time_features, features)
+            probability = availability_model['predictor'].predict_proba(X)[0]
         
-        # Predict
-        prediction = availability_model['predictor'].predict(X)[0]
-        probability = availability_model['predictor'].predict_proba(X)[0]
+        # Class derived from the probabilities, matching predict()'s argmax
+        # with ties going to 'occupied', without a second forward pass
+        prediction = probability[1] > 0.5
         
         return jsonify({
             'success': True,
@@ -217,19 +566,18 @@ def predict_availability():
             'confidence': float(max(probability)),
             'prediction_time': timestamp.isoformat(),
             'features_used': {
-                'city': data.get('city'),
-                'area': data.get('area'),
-                'parking_type': data.get('parking_type'),
-                'hour': timestamp.hour,
-                'day_of_week': timestamp.strftime('%A'),
-                'is_weekend': bool(features['is_weekend']),
-                'is_peak_hour': bool(features['is_peak_hour'])
+                'city': features['city'],
+                'area': features['area'],
+                'parking_type': features['parking_type'],
+                'hour': time_features.hour,
+                'day_of_week': _DAY_NAMES[time_features.day_of_week],
+                'is_weekend': bool(time_features.is_weekend),
+                'is_peak_hour': bool(time_features.is_peak_hour)
             }
         })
         
     except Exception as e:
-        print(f"Error in availability prediction: {e}")
-        traceback.print_exc()
+        log.exception('Error in availability prediction')
         return jsonify({
             'success': False,
             'error': str(e)
@@ -269,68 +617,43 @@ def batch_predict_availability():
                 'error': 'No predictions requested'
             }), 400
         
-        results = []
+        # Parse all timestamps at once and extract time features as columns
+        timestamps = parse_timestamp_batch([req.get('timestamp') for req in predictions_request])
+        time_columns = extract_time_feature_columns(timestamps)
         
-        for req in predictions_request:
-            # Parse timestamp
-            if 'timestamp' in req and req['timestamp']:
-                timestamp = datetime.fromisoformat(req['timestamp'].replace('Z', '+00:00'))
-            else:
-                timestamp = datetime.now()
-            
-            # Extract time features
-            features = extract_time_features(timestamp)
-            
-            # Add location features
-            features['city'] = req.get('city', 'Unknown')
-            features['area'] = req.get('area', 'Unknown')
-            features['parking_type'] = req.get('parking_type', 'street')
-            features['is_ev_charging'] = int(req.get('is_ev_charging', False))
-            features['is_handicap'] = int(req.get('is_handicap', False))
-            features['price_per_hour'] = float(req.get('price_per_hour', 20.0))
-            features['nearby_slots_count'] = int(req.get('nearby_slots_count', 10))
-            features['historical_occupancy'] = simulate_occupancy(features)
-            
-            # Prepare DataFrame
-            X = pd.DataFrame([features])
-            
-            # Encode categorical features
-            categorical_features = ['city', 'area', 'parking_type', 'season', 'time_category']
-            
-            for feature in categorical_features:
-                if feature in X.columns:
-                    le = availability_model['label_encoders'][feature]
-                    try:
-                        X[feature + '_encoded'] = le.transform(X[feature].astype(str))
-                    except ValueError:
-                        X[feature + '_encoded'] = 0
-                    X = X.drop(feature, axis=1)
-            
-            # Create cyclical features
-            X['hour_sin'] = np.sin(2 * np.pi * X['hour'] / 24)
-            X['hour_cos'] = np.cos(2 * np.pi * X['hour'] / 24)
-            X['dow_sin'] = np.sin(2 * np.pi * X['day_of_week'] / 7)
-            X['dow_cos'] = np.cos(2 * np.pi * X['day_of_week'] / 7)
-            X['month_sin'] = np.sin(2 * np.pi * X['month'] / 12)
-            X['month_cos'] = np.cos(2 * np.pi * X['month'] / 12)
-            
-            # Ensure same features as training
-            for col in availability_model['feature_columns']:
-                if col not in X.columns:
-                    X[col] = 0
-            
-            X = X[availability_model['feature_columns']]
-            
-            # Predict
-            prediction = availability_model['predictor'].predict(X)[0]
-            probability = availability_model['predictor'].predict_proba(X)[0]
-            
-            results.append({
+        # Location features
+        feature_rows = [
+            {
+                'city': req.get('city', 'Unknown'),
+                'area': req.get('area', 'Unknown'),
+                'parking_type': req.get('parking_type', 'street'),
+                'is_ev_charging': int(req.get('is_ev_charging', False)),
+                'is_handicap': int(req.get('is_handicap', False)),
+                'price_per_hour': float(req.get('price_per_hour', 20.0)),
+                'nearby_slots_count': int(req.get('nearby_slots_count', 10))
+            }
+            for req in predictions_request
+        ]
+        
+        if availability_model['uses_occupancy']:
+            occupancy = simulate_occupancy_batch(time_columns, [f['parking_type'] for f in feature_rows])
+            for features, historical_occupancy in zip(feature_rows, occupancy):
+                features['historical_occupancy'] = historical_occupancy
+        
+        # Score the whole batch with a single model call
+        X = build_feature_matrix(time_columns, feature_rows)
+        probabilities = availability_model['predictor'].predict_proba(X)
+        predictions = probabilities[:, 1] > 0.5
+        
+        results = [
+            {
                 'slot_id': req.get('slot_id'),
                 'is_available': bool(prediction),
                 'availability_probability': float(probability[1]),
                 'confidence': float(max(probability))
-            })
+            }
+            for req, prediction, probability in zip(predictions_request, predictions, probabilities)
+        ]
         
         return jsonify({
             'success': True,
@@ -339,8 +662,7 @@ def batch_predict_availability():
         })
         
     except Exception as e:
-        print(f"Error in batch availability prediction: {e}")
-        traceback.print_exc()
+        log.exception('Error in batch availability prediction')
         return jsonify({
             'success': False,
             'error': str(e)
@@ -355,7 +677,12 @@ if __name__ == '__main__':
     # Load model
     if load_availability_model():
         print("\n✓ Starting API server on http://localhost:5001")
-        app.run(host='0.0.0.0', port=5001, debug=True)
+        print("  (for production: gunicorn -c gunicorn_availability_conf.py -b 0.0.0.0:5001 availability_api:app)")
+        app.run(host='0.0.0.0', port=5001, debug=False, threaded=True)
     else:
         print("\n✗ Failed to load model. Please train the model first.")
         print("Run: python availability_model.py")
+else:
+    # Imported by a WSGI server (e.g. gunicorn with preload_app): load the
+    # model once at import so workers share it
+    load_availability_model()
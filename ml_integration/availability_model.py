@@ -8,37 +8,92 @@ Uses historical patterns, time features, and location characteristics.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import joblib
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, f1_score
 from sklearn.preprocessing import LabelEncoder
 import json
+import os
 import warnings
+from functools import lru_cache
+from config import ENABLE_CACHE
+from compiled_model import export_compiled_model, load_compiled_classifier
+from model_store import AVAILABILITY_COMPRESSION, load_model_file, save_model_file
+from serving_utils import bucket
 warnings.filterwarnings('ignore')
 
+# Prediction cache (enabled via config.ENABLE_CACHE); price and nearby-slot
+# count are rounded to CACHE_BUCKET_STEP so similar requests share entries
+PREDICTION_CACHE_SIZE = 8192
+CACHE_BUCKET_STEP = 5
+
+
+# Slot fields used for training data, with defaults for missing values
+SLOT_DEFAULTS = {
+    'city': 'Unknown',
+    'area': 'Unknown',
+    'type': 'street',
+    'isEVCharging': False,
+    'isHandicap': False,
+    'pricePerHour': 20.0
+}
+
+# Cyclical encodings of hour (0-23), day of week (0-6) and month (1-12, stored
+# at month - 1), precomputed since each takes only a handful of values. Kept
+# in float32 so that values equal up to rounding (e.g. -0.5000000000000004 and
+# -0.4999999999999998) are identical, as they are for the float32 compiled model.
+HOUR_SIN = np.sin(2 * np.pi * np.arange(24) / 24).astype(np.float32)
+HOUR_COS = np.cos(2 * np.pi * np.arange(24) / 24).astype(np.float32)
+DOW_SIN = np.sin(2 * np.pi * np.arange(7) / 7).astype(np.float32)
+DOW_COS = np.cos(2 * np.pi * np.arange(7) / 7).astype(np.float32)
+MONTH_SIN = np.sin(2 * np.pi * np.arange(1, 13) / 12).astype(np.float32)
+MONTH_COS = np.cos(2 * np.pi * np.arange(1, 13) / 12).astype(np.float32)
+
+# Season per month (indexed by month - 1) and time of day category per hour
+SEASON_BY_MONTH = np.array(
+    ['winter'] * 2 + ['spring'] * 3 + ['summer'] * 3 + ['fall'] * 3 + ['winter']
+)
+TIME_CATEGORY_BY_HOUR = np.array(
+    ['late_night'] * 6 + ['morning'] * 6 + ['afternoon'] * 5 + ['evening'] * 4 + ['night'] * 3
+)
+
+# String-valued features, stored as pandas categoricals and label-encoded for the model
+CATEGORICAL_FEATURES = ['city', 'area', 'parking_type', 'season', 'time_category']
+
+# Most categories HistGradientBoosting splits on natively; features with more
+# are passed to the model as ordinal codes instead
+HGB_MAX_CATEGORIES = 255
+
 
 class AvailabilityPredictor:
     """Predicts parking slot availability based on time and location features."""
     
     def __init__(self):
         self.model = None
+        self._compiled_model = None
         self.label_encoders = {}
+        self._encoder_maps = {}
         self.feature_columns = []
+        self._col_index = {}
         self.metadata = {}
+        self._rng = np.random.default_rng()
+        self._predict_cached = lru_cache(maxsize=PREDICTION_CACHE_SIZE)(self._predict_probabilities)
     
-    def generate_training_data(self, parking_slots_file='parking_slots_all.json', num_samples=50000):
+    def generate_training_data(self, parking_slots_file='parking_slots_all.json', num_samples=50000,
+                               seed=None):
         """
         Generate synthetic training data based on parking slots.
         
         Args:
             parking_slots_file: Path to parking slots JSON file
             num_samples: Number of training samples to generate
+            seed: Seed for the random generator (None for a fresh one)
         
         Returns:
             DataFrame with training data
         """
         print(f"Generating {num_samples} training samples...")
+        rng = np.random.default_rng(seed)
         
         # Load parking slots
         try:
@@ -46,157 +101,167 @@ class AvailabilityPredictor:
                 data = json.load(f)
                 if isinstance(data, dict) and 'slots' in data:
                     parking_slots = data['slots']
+                elif isinstance(data, dict):
+                    # City -> slots mapping (parking_slots_all.json layout)
+                    parking_slots = [slot for city_slots in data.values() for slot in city_slots]
                 else:
                     parking_slots = data
         except FileNotFoundError:
             print(f"Warning: {parking_slots_file} not found. Using default parking data.")
-            parking_slots = self._get_default_parking_data()
-        
-        samples = []
-        
-        for _ in range(num_samples):
-            # Select random parking slot
-            slot = np.random.choice(parking_slots)
-            
-            # Generate random timestamp (past 6 months)
-            days_ago = np.random.randint(0, 180)
-            hour = np.random.randint(0, 24)
-            minute = np.random.randint(0, 60)
-            
-            timestamp = datetime.now() - timedelta(days=days_ago, hours=hour, minutes=minute)
-            
-            # Extract time features
-            features = self._extract_time_features(timestamp)
-            
-            # Add location features
-            features['city'] = slot.get('city', 'Unknown')
-            features['area'] = slot.get('area', 'Unknown')
-            features['parking_type'] = slot.get('type', 'street')
-            features['is_ev_charging'] = int(slot.get('isEVCharging', False))
-            features['is_handicap'] = int(slot.get('isHandicap', False))
-            
-            # Add historical demand pattern (simulated)
-            features['historical_occupancy'] = self._simulate_occupancy(features)
-            features['nearby_slots_count'] = np.random.randint(5, 50)
-            features['price_per_hour'] = slot.get('pricePerHour', 20.0)
-            
-            # Target: availability (1 = available, 0 = occupied)
-            # Higher probability of being occupied during peak hours
-            availability_prob = self._calculate_availability_probability(features)
-            features['is_available'] = int(np.random.random() > availability_prob)
-            
-            samples.append(features)
-        
-        df = pd.DataFrame(samples)
+            parking_slots = self._get_default_parking_data(rng)
+        
+        # Slot attributes as columns, with the same defaults as slot.get(...)
+        slots = pd.DataFrame(list(parking_slots)).reindex(columns=list(SLOT_DEFAULTS))
+        slots = slots.fillna(SLOT_DEFAULTS)
+        
+        # Select random parking slots
+        sampled = slots.iloc[rng.integers(0, len(slots), num_samples)]
+        
+        # Generate random timestamps (past 6 months)
+        days_ago = rng.integers(0, 180, num_samples)
+        hours_ago = rng.integers(0, 24, num_samples)
+        minutes_ago = rng.integers(0, 60, num_samples)
+        
+        offsets = (pd.to_timedelta(days_ago, unit='D')
+                   + pd.to_timedelta(hours_ago, unit='h')
+                   + pd.to_timedelta(minutes_ago, unit='m'))
+        timestamps = pd.Timestamp(datetime.now()) - offsets
+        
+        # Extract time features
+        df = pd.DataFrame(self._extract_time_feature_columns(timestamps))
+        
+        # Add location features
+        df['city'] = sampled['city'].to_numpy()
+        df['area'] = sampled['area'].to_numpy()
+        df['parking_type'] = sampled['type'].to_numpy()
+        df['is_ev_charging'] = sampled['isEVCharging'].to_numpy().astype(np.uint8)
+        df['is_handicap'] = sampled['isHandicap'].to_numpy().astype(np.uint8)
+        
+        # Historical demand pattern (simulated); only drives the labels, since
+        # it is a noisy function of features the model already sees
+        historical_occupancy = self._simulate_occupancy(df, rng)
+        df['nearby_slots_count'] = rng.integers(5, 50, num_samples)
+        df['price_per_hour'] = sampled['pricePerHour'].to_numpy().astype(float)
+        
+        # Target: availability (1 = available, 0 = occupied)
+        # Higher probability of being occupied during peak hours
+        availability_prob = self._calculate_availability_probability(df, historical_occupancy, rng)
+        df['is_available'] = (rng.random(num_samples) > availability_prob).astype(np.uint8)
+        
+        for feature in CATEGORICAL_FEATURES:
+            df[feature] = df[feature].astype('category')
+        
         print(f"Generated {len(df)} samples")
         return df
     
-    def _extract_time_features(self, timestamp):
-        """Extract time-based features from timestamp."""
+    def _extract_time_feature_columns(self, timestamps):
+        """Time feature columns for a DatetimeIndex/Series of timestamps."""
+        timestamps = pd.DatetimeIndex(timestamps)
+        return self._extract_time_features_arr(
+            timestamps.hour.to_numpy(),
+            timestamps.dayofweek.to_numpy(),
+            timestamps.month.to_numpy(),
+            timestamps.day.to_numpy()
+        )
+    
+    def _extract_time_features_arr(self, hour, day_of_week, month, day_of_month):
+        """Extract time-based features as uint8 columns from hour/weekday/month/day arrays."""
+        hour = np.asarray(hour).astype(np.uint8)
+        day_of_week = np.asarray(day_of_week).astype(np.uint8)
+        month = np.asarray(month).astype(np.uint8)
+        is_peak_morning = (hour >= 7) & (hour <= 10)
+        is_peak_evening = (hour >= 17) & (hour <= 20)
         return {
-            'hour': timestamp.hour,
-            'day_of_week': timestamp.weekday(),
-            'day_of_month': timestamp.day,
-            'month': timestamp.month,
-            'is_weekend': int(timestamp.weekday() >= 5),
-            'is_peak_morning': int(7 <= timestamp.hour <= 10),
-            'is_peak_evening': int(17 <= timestamp.hour <= 20),
-            'is_peak_hour': int((7 <= timestamp.hour <= 10) or (17 <= timestamp.hour <= 20)),
-            'is_business_hours': int(9 <= timestamp.hour <= 18),
-            'is_night': int(timestamp.hour >= 22 or timestamp.hour <= 5),
-            'season': self._get_season(timestamp.month),
-            'time_category': self._get_time_category(timestamp.hour)
+            'hour': hour,
+            'day_of_week': day_of_week,
+            'day_of_month': np.asarray(day_of_month).astype(np.uint8),
+            'month': month,
+            'is_weekend': (day_of_week >= 5).view(np.uint8),
+            'is_peak_morning': is_peak_morning.view(np.uint8),
+            'is_peak_evening': is_peak_evening.view(np.uint8),
+            'is_peak_hour': (is_peak_morning | is_peak_evening).view(np.uint8),
+            'is_business_hours': ((hour >= 9) & (hour <= 18)).view(np.uint8),
+            'is_night': ((hour >= 22) | (hour <= 5)).view(np.uint8),
+            'season': SEASON_BY_MONTH[month - 1],
+            'time_category': TIME_CATEGORY_BY_HOUR[hour]
         }
     
-    def _get_season(self, month):
-        """Get season from month."""
-        if month in [12, 1, 2]:
-            return 'winter'
-        elif month in [3, 4, 5]:
-            return 'spring'
-        elif month in [6, 7, 8]:
-            return 'summer'
-        else:
-            return 'fall'
+    def _add_cyclical_features(self, features):
+        """Add sin/cos encodings of hour, day of week and month via lookup tables."""
+        hour = np.asarray(features['hour'], dtype=np.intp)
+        day_of_week = np.asarray(features['day_of_week'], dtype=np.intp)
+        month = np.asarray(features['month'], dtype=np.intp) - 1
+        features['hour_sin'] = HOUR_SIN[hour]
+        features['hour_cos'] = HOUR_COS[hour]
+        features['dow_sin'] = DOW_SIN[day_of_week]
+        features['dow_cos'] = DOW_COS[day_of_week]
+        features['month_sin'] = MONTH_SIN[month]
+        features['month_cos'] = MONTH_COS[month]
     
-    def _get_time_category(self, hour):
-        """Categorize time of day."""
-        if 0 <= hour < 6:
-            return 'late_night'
-        elif 6 <= hour < 12:
-            return 'morning'
-        elif 12 <= hour < 17:
-            return 'afternoon'
-        elif 17 <= hour < 21:
-            return 'evening'
-        else:
-            return 'night'
-    
-    def _simulate_occupancy(self, features):
-        """Simulate historical occupancy based on features."""
-        base_occupancy = 0.5
+    def _simulate_occupancy(self, features, rng):
+        """
+        Simulate historical occupancy based on features.
+        
+        Works on whole columns (DataFrame or dict of arrays) as well as on a
+        single row's scalars; branches become mask arithmetic.
+        """
+        is_peak_hour = np.asarray(features['is_peak_hour'], dtype=bool)
+        is_business_hours = np.asarray(features['is_business_hours'], dtype=bool)
+        is_weekend = np.asarray(features['is_weekend'], dtype=bool)
+        is_night = np.asarray(features['is_night'], dtype=bool)
+        parking_type = np.asarray(features['parking_type'])
+        
+        base_occupancy = np.full(is_peak_hour.shape, 0.5)
         
         # Peak hours increase occupancy
-        if features['is_peak_hour']:
-            base_occupancy += 0.3
+        base_occupancy += 0.3 * is_peak_hour
         
         # Business hours
-        if features['is_business_hours']:
-            base_occupancy += 0.15
+        base_occupancy += 0.15 * is_business_hours
         
         # Weekend patterns
-        if features['is_weekend']:
-            if features['parking_type'] == 'mall':
-                base_occupancy += 0.2
-            elif features['parking_type'] == 'commercial':
-                base_occupancy -= 0.2
+        base_occupancy += 0.2 * (is_weekend & (parking_type == 'mall'))
+        base_occupancy -= 0.2 * (is_weekend & (parking_type == 'commercial'))
         
         # Type-specific patterns
-        if features['parking_type'] == 'airport':
-            base_occupancy += 0.25
-        elif features['parking_type'] == 'residential':
-            if features['is_night']:
-                base_occupancy += 0.3
+        base_occupancy += 0.25 * (parking_type == 'airport')
+        base_occupancy += 0.3 * ((parking_type == 'residential') & is_night)
         
-        return min(max(base_occupancy + np.random.normal(0, 0.1), 0), 1)
+        base_occupancy += rng.normal(0, 0.1, base_occupancy.shape)
+        return np.clip(base_occupancy, 0, 1)
     
-    def _calculate_availability_probability(self, features):
+    def _calculate_availability_probability(self, features, historical_occupancy, rng):
         """Calculate probability that a slot is occupied (inverse of availability)."""
         # Start with historical occupancy
-        occupancy_prob = features['historical_occupancy']
+        occupancy_prob = np.array(historical_occupancy, dtype=float)
         
         # Adjust based on specific conditions
-        if features['is_ev_charging']:
-            occupancy_prob *= 0.85  # EV slots slightly less utilized
-        
-        if features['is_handicap']:
-            occupancy_prob *= 0.7  # Handicap slots less utilized
+        occupancy_prob *= np.where(features['is_ev_charging'], 0.85, 1.0)  # EV slots slightly less utilized
+        occupancy_prob *= np.where(features['is_handicap'], 0.7, 1.0)  # Handicap slots less utilized
         
         # Random variation
-        occupancy_prob += np.random.normal(0, 0.05)
+        occupancy_prob += rng.normal(0, 0.05, occupancy_prob.shape)
         
-        return min(max(occupancy_prob, 0), 1)
+        return np.clip(occupancy_prob, 0, 1)
     
-    def _get_default_parking_data(self):
+    def _get_default_parking_data(self, rng, n_slots=100):
         """Default parking data if file not found."""
         cities = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai']
         areas = ['Downtown', 'Suburb', 'Airport', 'Mall']
         types = ['street', 'commercial', 'mall', 'airport', 'residential']
         
-        slots = []
-        for i in range(100):
-            slots.append({
-                'id': f'SLOT-{i:04d}',
-                'city': np.random.choice(cities),
-                'area': np.random.choice(areas),
-                'type': np.random.choice(types),
-                'pricePerHour': np.random.uniform(10, 50),
-                'isEVCharging': np.random.random() > 0.7,
-                'isHandicap': np.random.random() > 0.9
-            })
-        return slots
+        slots = pd.DataFrame({
+            'id': [f'SLOT-{i:04d}' for i in range(n_slots)],
+            'city': rng.choice(cities, n_slots),
+            'area': rng.choice(areas, n_slots),
+            'type': rng.choice(types, n_slots),
+            'pricePerHour': rng.uniform(10, 50, n_slots),
+            'isEVCharging': rng.random(n_slots) > 0.7,
+            'isHandicap': rng.random(n_slots) > 0.9
+        })
+        return slots.to_dict('records')
     
-    def train(self, data, test_size=0.2, random_state=42):
+    def train(self, data, test_size=0.2, random_state=42, run_cv=False):
         """
         Train the availability prediction model.
         
@@ -204,53 +269,80 @@ class AvailabilityPredictor:
             data: DataFrame with training data
             test_size: Proportion of data for testing
             random_state: Random seed
+            run_cv: Also report 5-fold cross-validation accuracy (refits the model 5 times)
         
         Returns:
             Dictionary with performance metrics
         """
         print("Training availability prediction model...")
         
-        # Prepare features
-        feature_cols = [col for col in data.columns if col != 'is_available']
+        # Prepare features (historical_occupancy may be present in data saved
+        # by older versions; it is not used as a feature)
+        feature_cols = [col for col in data.columns if col not in ('is_available', 'historical_occupancy')]
         X = data[feature_cols].copy()
         y = data['is_available']
         
-        # Encode categorical features
-        categorical_features = ['city', 'area', 'parking_type', 'season', 'time_category']
-        
-        for feature in categorical_features:
+        # Encode categorical features from their category codes; the encoder
+        # is fitted on the handful of categories only, not on every row
+        for feature in CATEGORICAL_FEATURES:
             if feature in X.columns:
-                le = LabelEncoder()
-                X[feature + '_encoded'] = le.fit_transform(X[feature].astype(str))
+                column = X[feature]
+                if not isinstance(column.dtype, pd.CategoricalDtype):
+                    column = column.astype(str).astype('category')
+                elif column.isna().any():
+                    # Missing values have code -1; give them their own 'nan'
+                    # class, as astype(str) does for non-categorical columns
+                    if 'nan' not in column.cat.categories:
+                        column = column.cat.add_categories('nan')
+                    column = column.fillna('nan')
+                categories = column.cat.categories.astype(str)
+                le = LabelEncoder().fit(categories)
+                # Smallest unsigned type for the codes: uint8 for the native
+                # categoricals, wider for features beyond HGB_MAX_CATEGORIES,
+                # which the model takes as ordinal codes
+                code_dtype = np.min_scalar_type(max(len(categories) - 1, 0))
+                X[feature + '_encoded'] = le.transform(categories).astype(code_dtype)[column.cat.codes.to_numpy()]
                 self.label_encoders[feature] = le
-                X = X.drop(feature, axis=1)
+                self._encoder_maps[feature] = self._build_encoder_map(le)
+        X = X.drop(columns=[feature for feature in CATEGORICAL_FEATURES if feature in X.columns])
         
         # Create cyclical features
-        X['hour_sin'] = np.sin(2 * np.pi * X['hour'] / 24)
-        X['hour_cos'] = np.cos(2 * np.pi * X['hour'] / 24)
-        X['dow_sin'] = np.sin(2 * np.pi * X['day_of_week'] / 7)
-        X['dow_cos'] = np.cos(2 * np.pi * X['day_of_week'] / 7)
-        X['month_sin'] = np.sin(2 * np.pi * X['month'] / 12)
-        X['month_cos'] = np.cos(2 * np.pi * X['month'] / 12)
+        self._add_cyclical_features(X)
         
         self.feature_columns = X.columns.tolist()
+        self._col_index = {col: i for i, col in enumerate(self.feature_columns)}
+        
+        # HistGradientBoosting validates input as float64; cast once up front
+        # so fit/predict/cross-validation don't each make their own copy
+        X = X.astype(np.float64)
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=test_size, random_state=random_state, stratify=y
         )
         
-        # Train Gradient Boosting Classifier
-        print("Training Gradient Boosting Classifier...")
-        self.model = GradientBoostingClassifier(
-            n_estimators=200,
+        # Train Histogram Gradient Boosting Classifier; the label-encoded
+        # columns are split on natively as categories when they have few
+        # enough of them
+        print("Training Histogram Gradient Boosting Classifier...")
+        self.model = HistGradientBoostingClassifier(
+            max_iter=200,
             learning_rate=0.1,
-            max_depth=5,
+            max_depth=8,
+            max_leaf_nodes=15,
+            categorical_features=[feature + '_encoded' for feature, le in self.label_encoders.items()
+                                  if len(le.classes_) <= HGB_MAX_CATEGORIES],
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=10,
+            tol=1e-4,
             random_state=random_state,
             verbose=0
         )
         
         self.model.fit(X_train, y_train)
+        self._compiled_model = None
+        self._predict_cached.cache_clear()
         
         # Evaluate
         y_pred_train = self.model.predict(X_train)
@@ -262,16 +354,19 @@ class AvailabilityPredictor:
         train_f1 = f1_score(y_train, y_pred_train)
         test_f1 = f1_score(y_test, y_pred_test)
         
-        # Cross-validation
-        cv_scores = cross_val_score(self.model, X_train, y_train, cv=5, scoring='accuracy')
+        # Cross-validation (optional; the held-out test set is the default estimate)
+        cv_scores = None
+        if run_cv:
+            cv_scores = cross_val_score(self.model, X_train, y_train, cv=5, scoring='accuracy')
         
         metrics = {
             'train_accuracy': float(train_accuracy),
             'test_accuracy': float(test_accuracy),
             'train_f1': float(train_f1),
             'test_f1': float(test_f1),
-            'cv_mean_accuracy': float(cv_scores.mean()),
-            'cv_std_accuracy': float(cv_scores.std())
+            'cv_mean_accuracy': float(cv_scores.mean()) if cv_scores is not None else None,
+            'cv_std_accuracy': float(cv_scores.std()) if cv_scores is not None else None,
+            'n_iterations': int(self.model.n_iter_)
         }
         
         print(f"\n{'='*50}")
@@ -281,7 +376,9 @@ class AvailabilityPredictor:
         print(f"Testing Accuracy:    {test_accuracy:.4f}")
         print(f"Training F1 Score:   {train_f1:.4f}")
         print(f"Testing F1 Score:    {test_f1:.4f}")
-        print(f"CV Accuracy:         {cv_scores.mean():.4f} (+/- {cv_scores.std():.4f})")
+        if cv_scores is not None:
+            print(f"CV Accuracy:         {cv_scores.mean():.4f} (+/- {cv_scores.std():.4f})")
+        print(f"Boosting Iterations: {self.model.n_iter_}")
         print(f"{'='*50}\n")
         
         # Classification report
@@ -290,7 +387,7 @@ class AvailabilityPredictor:
                                    target_names=['Occupied', 'Available']))
         
         self.metadata = {
-            'model_type': 'gradient_boosting_classifier',
+            'model_type': 'hist_gradient_boosting_classifier',
             'trained_at': datetime.now().isoformat(),
             'n_samples': len(data),
             'n_features': len(self.feature_columns),
@@ -321,83 +418,232 @@ class AvailabilityPredictor:
         if self.model is None:
             raise ValueError("Model not trained. Call train() first.")
         
-        # Extract time features
-        features = self._extract_time_features(timestamp)
+        request = {
+            'city': city,
+            'area': area,
+            'parking_type': parking_type,
+            'timestamp': timestamp,
+            'is_ev_charging': is_ev_charging,
+            'is_handicap': is_handicap,
+            'price_per_hour': price_per_hour,
+            'nearby_slots_count': nearby_slots_count
+        }
         
-        # Add location features
-        features['city'] = city
-        features['area'] = area
-        features['parking_type'] = parking_type
-        features['is_ev_charging'] = int(is_ev_charging)
-        features['is_handicap'] = int(is_handicap)
-        features['price_per_hour'] = price_per_hour
-        features['nearby_slots_count'] = nearby_slots_count
+        if ENABLE_CACHE:
+            # Time features only depend on the hour, so the key uses the
+            # timestamp truncated to it
+            probability = self._predict_cached(
+                str(city), str(area), str(parking_type),
+                timestamp.replace(minute=0, second=0, microsecond=0),
+                bool(is_ev_charging), bool(is_handicap),
+                bucket(price_per_hour, CACHE_BUCKET_STEP), bucket(nearby_slots_count, CACHE_BUCKET_STEP)
+            )
+            return self._format_predictions([request], np.array([probability]))[0]
+        
+        X = self._build_feature_row(request)
+        predictor = self._compiled_model or self.model
+        return self._format_predictions([request], predictor.predict_proba(X))[0]
+    
+    def _predict_probabilities(self, city, area, parking_type, timestamp,
+                               is_ev_charging, is_handicap, price_bucket, nearby_bucket):
+        """
+        (occupied, available) probabilities for a discretized request.
         
-        # Estimate historical occupancy
-        features['historical_occupancy'] = self._simulate_occupancy(features)
+        Backs the per-predictor LRU cache. For models trained with the
+        simulated occupancy feature, its noise is drawn once per cache entry.
+        """
+        X = self._build_feature_row({
+            'city': city,
+            'area': area,
+            'parking_type': parking_type,
+            'timestamp': timestamp,
+            'is_ev_charging': is_ev_charging,
+            'is_handicap': is_handicap,
+            'price_per_hour': price_bucket,
+            'nearby_slots_count': nearby_bucket
+        })
+        predictor = self._compiled_model or self.model
+        probability = predictor.predict_proba(X)[0]
+        return float(probability[0]), float(probability[1])
+    
+    def predict_availability_batch(self, requests):
+        """
+        Predict availability for many parking slots/times with a single model call.
         
-        # Prepare features for prediction
-        X = pd.DataFrame([features])
+        Args:
+            requests: List of dicts with the keyword arguments of predict_availability
         
-        # Encode categorical features
-        categorical_features = ['city', 'area', 'parking_type', 'season', 'time_category']
+        Returns:
+            List of prediction result dictionaries, in request order
+        """
+        if self.model is None:
+            raise ValueError("Model not trained. Call train() first.")
         
-        for feature in categorical_features:
-            if feature in X.columns:
-                le = self.label_encoders[feature]
-                # Handle unseen categories
-                try:
-                    X[feature + '_encoded'] = le.transform(X[feature].astype(str))
-                except ValueError:
-                    # Use most common category if unseen
-                    X[feature + '_encoded'] = 0
-                X = X.drop(feature, axis=1)
+        X = self._build_feature_matrix(requests)
+        # Prefer the compiled library when load() found a usable one
+        predictor = self._compiled_model or self.model
+        return self._format_predictions(requests, predictor.predict_proba(X))
+    
+    def _format_predictions(self, requests, probabilities):
+        """Result dictionaries from an (N, 2) predict_proba output."""
+        predictions = probabilities.argmax(axis=1)
+        
+        return [
+            {
+                'is_available': bool(prediction),
+                'availability_probability': float(probability[1]),
+                'occupancy_probability': float(probability[0]),
+                'confidence': float(max(probability)),
+                'prediction_time': request['timestamp'].isoformat()
+            }
+            for request, prediction, probability in zip(requests, predictions, probabilities)
+        ]
+    
+    def _build_feature_matrix(self, requests):
+        """
+        Build the (N, F) feature matrix for a list of prediction requests.
+        
+        Columns follow self.feature_columns; features the model was not
+        trained on are ignored and missing ones are left at 0.
+        """
+        timestamps = [request['timestamp'] for request in requests]
+        
+        # Extract time features
+        features = self._extract_time_features_arr(
+            [ts.hour for ts in timestamps],
+            [ts.weekday() for ts in timestamps],
+            [ts.month for ts in timestamps],
+            [ts.day for ts in timestamps]
+        )
+        
+        # Add location features
+        features['city'] = np.array([str(request['city']) for request in requests])
+        features['area'] = np.array([str(request['area']) for request in requests])
+        features['parking_type'] = np.array([str(request['parking_type']) for request in requests])
+        features['is_ev_charging'] = np.array([int(request.get('is_ev_charging', False)) for request in requests])
+        features['is_handicap'] = np.array([int(request.get('is_handicap', False)) for request in requests])
+        features['price_per_hour'] = np.array([request.get('price_per_hour', 20.0) for request in requests], dtype=float)
+        features['nearby_slots_count'] = np.array([request.get('nearby_slots_count', 10) for request in requests])
+        
+        # Estimate historical occupancy (only models saved by older versions use it)
+        if 'historical_occupancy' in self._col_index:
+            features['historical_occupancy'] = self._simulate_occupancy(features, self._rng)
+        
+        # Encode categorical features
+        for feature in CATEGORICAL_FEATURES:
+            encoder_map = self._encoder_maps[feature]
+            # Unseen categories fall back to code 0
+            features[feature + '_encoded'] = np.array(
+                [encoder_map.get(value, 0) for value in features.pop(feature)])
         
         # Create cyclical features
-        X['hour_sin'] = np.sin(2 * np.pi * X['hour'] / 24)
-        X['hour_cos'] = np.cos(2 * np.pi * X['hour'] / 24)
-        X['dow_sin'] = np.sin(2 * np.pi * X['day_of_week'] / 7)
-        X['dow_cos'] = np.cos(2 * np.pi * X['day_of_week'] / 7)
-        X['month_sin'] = np.sin(2 * np.pi * X['month'] / 12)
-        X['month_cos'] = np.cos(2 * np.pi * X['month'] / 12)
+        self._add_cyclical_features(features)
         
-        # Ensure same features as training
-        for col in self.feature_columns:
-            if col not in X.columns:
-                X[col] = 0
+        # Same features and dtype as training
+        X = np.zeros((len(requests), len(self.feature_columns)), dtype=np.float64)
+        for i, col in enumerate(self.feature_columns):
+            if col in features:
+                X[:, i] = features[col]
         
-        X = X[self.feature_columns]
+        return X
+    
+    def _build_feature_row(self, request):
+        """
+        Build the (1, F) feature matrix for a single request.
         
-        # Predict
-        prediction = self.model.predict(X)[0]
-        probability = self.model.predict_proba(X)[0]
+        Scalar counterpart of _build_feature_matrix: values are written
+        straight into their columns, with no per-feature arrays.
+        """
+        timestamp = request['timestamp']
+        hour = timestamp.hour
+        day_of_week = timestamp.weekday()
+        month = timestamp.month
+        is_peak_morning = 7 <= hour <= 10
+        is_peak_evening = 17 <= hour <= 20
+        
+        features = {
+            'hour': hour,
+            'day_of_week': day_of_week,
+            'day_of_month': timestamp.day,
+            'month': month,
+            'is_weekend': day_of_week >= 5,
+            'is_peak_morning': is_peak_morning,
+            'is_peak_evening': is_peak_evening,
+            'is_peak_hour': is_peak_morning or is_peak_evening,
+            'is_business_hours': 9 <= hour <= 18,
+            'is_night': hour >= 22 or hour <= 5,
+            'parking_type': str(request['parking_type']),
+            'is_ev_charging': bool(request.get('is_ev_charging', False)),
+            'is_handicap': bool(request.get('is_handicap', False)),
+            'price_per_hour': request.get('price_per_hour', 20.0),
+            'nearby_slots_count': request.get('nearby_slots_count', 10),
+            'hour_sin': HOUR_SIN[hour],
+            'hour_cos': HOUR_COS[hour],
+            'dow_sin': DOW_SIN[day_of_week],
+            'dow_cos': DOW_COS[day_of_week],
+            'month_sin': MONTH_SIN[month - 1],
+            'month_cos': MONTH_COS[month - 1]
+        }
         
-        return {
-            'is_available': bool(prediction),
-            'availability_probability': float(probability[1]),
-            'occupancy_probability': float(probability[0]),
-            'confidence': float(max(probability)),
-            'prediction_time': timestamp.isoformat()
+        # Estimate historical occupancy (only models saved by older versions use it)
+        if 'historical_occupancy' in self._col_index:
+            features['historical_occupancy'] = float(self._simulate_occupancy(features, self._rng))
+        
+        # Encode categorical features (unseen categories fall back to code 0)
+        categories = {
+            'city': str(request['city']),
+            'area': str(request['area']),
+            'parking_type': features['parking_type'],
+            'season': SEASON_BY_MONTH[month - 1],
+            'time_category': TIME_CATEGORY_BY_HOUR[hour]
         }
+        for feature, value in categories.items():
+            features[feature + '_encoded'] = self._encoder_maps[feature].get(value, 0)
+        
+        x = np.zeros((1, len(self.feature_columns)), dtype=np.float64)
+        for name, value in features.items():
+            i = self._col_index.get(name)
+            if i is not None:
+                x[0, i] = value
+        
+        return x
+    
+    def _build_encoder_map(self, le):
+        """Category -> code lookup equivalent to le.transform."""
+        return {str(cls): i for i, cls in enumerate(le.classes_)}
+    
+    def _compiled_model_path(self, filepath):
+        """Shared library path next to the pickle (model.pkl -> model.so)."""
+        return os.path.splitext(filepath)[0] + '.so'
     
     def save(self, filepath='parking_availability_model.pkl'):
-        """Save the trained model."""
+        """Save the trained model, plus a compiled copy when Treelite is installed."""
         model_data = {
             'model': self.model,
             'label_encoders': self.label_encoders,
+            'encoder_maps': self._encoder_maps,
             'feature_columns': self.feature_columns,
             'metadata': self.metadata
         }
-        joblib.dump(model_data, filepath)
+        save_model_file(model_data, filepath, AVAILABILITY_COMPRESSION)
         print(f"Model saved to {filepath}")
+        export_compiled_model(self.model, self._compiled_model_path(filepath))
     
     def load(self, filepath='parking_availability_model.pkl'):
         """Load a trained model."""
-        model_data = joblib.load(filepath)
+        model_data = load_model_file(filepath, AVAILABILITY_COMPRESSION)
         self.model = model_data['model']
         self.label_encoders = model_data['label_encoders']
+        # Models saved before the maps were stored rebuild them from the encoders
+        self._encoder_maps = model_data.get('encoder_maps') or {
+            feature: self._build_encoder_map(le) for feature, le in self.label_encoders.items()
+        }
         self.feature_columns = model_data['feature_columns']
+        self._col_index = {col: i for i, col in enumerate(self.feature_columns)}
         self.metadata = model_data.get('metadata', {})
+        self._compiled_model = load_compiled_classifier(
+            self._compiled_model_path(filepath), filepath, len(self.feature_columns))
+        self._predict_cached.cache_clear()
         print(f"Model loaded from {filepath}")
 
 
@@ -413,13 +659,15 @@ def main():
     data = predictor.generate_training_data(num_samples=50000)
     
     # Save training data
-    data.to_csv('parking_availability_training_data.csv', index=False)
-    print(f"Training data saved to parking_availability_training_data.csv")
+    # Streamed in chunks and gzip-compressed (pd.read_csv reads it back as-is)
+    data.to_csv('parking_availability_training_data.csv.gz', index=False,
+                chunksize=10000, compression='gzip')
+    print(f"Training data saved to parking_availability_training_data.csv.gz")
     
     # Train model
     metrics = predictor.train(data)
     
-    # Save model
+    # Save model (and its compiled library, if Treelite is installed)
     predictor.save()
     
     # Save metadata
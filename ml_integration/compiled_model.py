@@ -0,0 +1,166 @@
+"""
+Compiled Tree Model Support
+
+Compiles trained tree ensembles to a native shared library with Treelite and
+TL2cgen, and wraps the library so it can stand in for the sklearn estimator
+at inference time. Both packages are optional; without them the pickled
+sklearn model is used as before.
+
+Also walks XGBoost regression trees for a single row with a numba kernel
+over flat node arrays (numba is optional as well).
+"""
+
+import json
+import os
+import numpy as np
+
+try:
+    import treelite
+    import tl2cgen
+except ImportError:
+    treelite = None
+    tl2cgen = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def is_available():
+    """Whether Treelite/TL2cgen are installed."""
+    return tl2cgen is not None
+
+
+def export_compiled_model(model, libpath, parallel_comp=8):
+    """
+    Compile a fitted sklearn tree ensemble to a shared library.
+
+    Args:
+        model: Fitted sklearn tree ensemble (e.g. HistGradientBoostingClassifier)
+        libpath: Output path of the shared library
+        parallel_comp: Number of translation units to split the trees into
+
+    Returns:
+        True if the library was written, False if Treelite is not installed
+    """
+    if not is_available():
+        return False
+
+    tl_model = treelite.sklearn.import_model(model)
+    tl2cgen.export_lib(tl_model, toolchain='gcc', libpath=libpath,
+                       params={'parallel_comp': parallel_comp})
+    print(f"Compiled model saved to {libpath}")
+    return True
+
+
+class CompiledBinaryClassifier:
+    """predict_proba adapter over a compiled binary classifier."""
+
+    def __init__(self, libpath):
+        self._predictor = tl2cgen.Predictor(libpath)
+        self.n_features_in_ = self._predictor.num_feature
+
+    def predict_proba(self, X):
+        positive = self._predictor.predict(
+            tl2cgen.DMatrix(np.asarray(X, dtype=np.float32))).reshape(-1)
+        return np.column_stack([1.0 - positive, positive])
+
+
+def load_compiled_classifier(libpath, source_path, n_features):
+    """
+    Load a compiled binary classifier if it is usable, else return None.
+
+    The library is only used when TL2cgen is installed, it is at least as new
+    as the pickled model it was compiled from, and its feature count matches.
+    """
+    if not is_available() or not os.path.exists(libpath):
+        return None
+
+    if os.path.exists(source_path) and os.path.getmtime(libpath) < os.path.getmtime(source_path):
+        print(f"Warning: {libpath} is older than {source_path}; ignoring compiled model")
+        return None
+
+    classifier = CompiledBinaryClassifier(libpath)
+    if classifier.n_features_in_ != n_features:
+        print(f"Warning: {libpath} expects {classifier.n_features_in_} features, "
+              f"model has {n_features}; ignoring compiled model")
+        return None
+
+    return classifier
+
+
+def _walk_trees(x, feature, threshold, left, right, default_left, value, base_score):
+    """Sum of the leaf values reached by one row, accumulated in float32 like XGBoost."""
+    total = base_score
+    for t in range(feature.shape[0]):
+        node = 0
+        while left[t, node] != -1:
+            v = x[feature[t, node]]
+            if np.isnan(v):
+                node = left[t, node] if default_left[t, node] else right[t, node]
+            elif v < threshold[t, node]:
+                node = left[t, node]
+            else:
+                node = right[t, node]
+        total += value[t, node]
+    return total
+
+
+_walk_trees_jit = njit(cache=True)(_walk_trees) if njit is not None else None
+
+
+class NumbaTreeRegressor:
+    """Single-row predictor over the trees of an XGBoost regression booster."""
+
+    def __init__(self, booster):
+        learner = json.loads(booster.save_raw('json'))['learner']
+        trees = learner['gradient_booster']['model']['trees']
+        n_nodes = max(len(tree['left_children']) for tree in trees)
+        shape = (len(trees), n_nodes)
+
+        self.feature = np.zeros(shape, dtype=np.int64)
+        self.threshold = np.zeros(shape, dtype=np.float32)
+        self.left = np.full(shape, -1, dtype=np.int64)
+        self.right = np.full(shape, -1, dtype=np.int64)
+        self.default_left = np.zeros(shape, dtype=np.bool_)
+        for t, tree in enumerate(trees):
+            n = len(tree['left_children'])
+            self.feature[t, :n] = tree['split_indices']
+            # Split threshold for inner nodes, leaf value for leaves
+            self.threshold[t, :n] = tree['split_conditions']
+            self.left[t, :n] = tree['left_children']
+            self.right[t, :n] = tree['right_children']
+            self.default_left[t, :n] = tree['default_left']
+        self.value = self.threshold.copy()
+
+        # Stored as e.g. '[9.499132E1]' by newer XGBoost versions
+        base_score = learner['learner_model_param']['base_score'].strip('[]')
+        self.base_score = np.float32(float(base_score))
+        self.n_features_in_ = int(learner['learner_model_param']['num_feature'])
+
+    def predict_row(self, x):
+        """Prediction for one float32 feature vector."""
+        return float(_walk_trees_jit(x, self.feature, self.threshold, self.left, self.right,
+                                     self.default_left, self.value, self.base_score))
+
+
+def load_numba_regressor(booster):
+    """
+    NumbaTreeRegressor for a plain gbtree squared-error booster, else None.
+
+    Other objectives (non-identity link), boosters (dart, gblinear) and
+    categorical splits are left to XGBoost itself, as is everything when
+    numba is not installed.
+    """
+    if _walk_trees_jit is None or booster is None:
+        return None
+
+    config = json.loads(booster.save_config())['learner']
+    if config['objective']['name'] != 'reg:squarederror' or config['gradient_booster']['name'] != 'gbtree':
+        return None
+    model = json.loads(booster.save_raw('json'))['learner']['gradient_booster']['model']
+    if any(any(tree['split_type']) for tree in model['trees']):
+        return None
+
+    return NumbaTreeRegressor(booster)
@@ -45,16 +45,18 @@ RANDOM_FOREST_PARAMS = {
     'n_jobs': -1
 }
 
-# Gradient Boosting Params
+# Gradient Boosting Params (HistGradientBoostingRegressor)
 GRADIENT_BOOSTING_PARAMS = {
-    'n_estimators': 200,
+    'max_iter': 200,
     'learning_rate': 0.1,
     'max_depth': 7,
-    'min_samples_split': 5,
+    'min_samples_leaf': 5,
+    'early_stopping': True,
     'random_state': 42
 }
 
-# Pricing Multipliers (used in data generation)
+# Pricing Multipliers (used in data generation by data_generator.py; nothing
+# in this directory reads them)
 TYPE_MULTIPLIERS = {
     'airport': 2.5,
     'commercial': 1.5,
@@ -110,7 +112,7 @@ CITY_DEMAND_BASE = {
 ENABLE_PREDICTION_LOGGING = True
 LOG_FILE = 'pricing_predictions.log'
 
-# Cache Settings (future enhancement)
+# Cache Settings (availability and pricing API prediction caches)
 ENABLE_CACHE = False
 CACHE_TTL = 300  # 5 minutes
 
@@ -0,0 +1,27 @@
+"""
+Derived Pricing Features
+
+Cyclical time encodings and interaction terms computed from the raw pricing
+inputs. Training (train_model) and serving (pricing_api) both build these
+model columns from DERIVED_FEATURES, so each formula is written only here.
+"""
+
+import numpy as np
+
+# Model column -> (input fields, formula over numpy arrays or scalars of
+# those fields, in order)
+DERIVED_FEATURES = {
+    # Cyclical encoding for hour (24-hour cycle), day of week (7-day cycle)
+    # and month (12-month cycle)
+    'hour_sin': (('hour',), lambda hour: np.sin(2 * np.pi * hour / 24)),
+    'hour_cos': (('hour',), lambda hour: np.cos(2 * np.pi * hour / 24)),
+    'dow_sin': (('day_of_week',), lambda day_of_week: np.sin(2 * np.pi * day_of_week / 7)),
+    'dow_cos': (('day_of_week',), lambda day_of_week: np.cos(2 * np.pi * day_of_week / 7)),
+    'month_sin': (('month',), lambda month: np.sin(2 * np.pi * month / 12)),
+    'month_cos': (('month',), lambda month: np.cos(2 * np.pi * month / 12)),
+    # Interaction terms
+    'demand_occupancy_interaction': (('demand_score', 'occupancy_rate'),
+                                     lambda demand_score, occupancy_rate: demand_score * occupancy_rate),
+    'weekend_evening': (('is_weekend', 'hour'),
+                        lambda is_weekend, hour: is_weekend * ((hour >= 17) & (hour <= 22))),
+}
@@ -0,0 +1,14 @@
+"""
+Gunicorn configuration for the availability API.
+
+Usage:
+    gunicorn -c gunicorn_availability_conf.py -b 0.0.0.0:5001 availability_api:app
+
+Same settings as gunicorn_conf.py, but always a single worker: the
+prediction cache lives in the worker process, so one threaded worker keeps
+one cache shared by every request.
+"""
+
+from gunicorn_conf import *  # noqa: F401,F403
+
+workers = 1
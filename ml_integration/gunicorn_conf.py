@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration for the pricing API.
+
+Usage:
+    gunicorn -c gunicorn_conf.py -b 0.0.0.0:5000 pricing_api:app
+
+The app module loads its model at import time, and preload_app imports it
+once in the master process, so the workers inherit the loaded model via
+copy-on-write instead of each loading its own copy. There is one worker per
+core by default (override with WEB_CONCURRENCY), each spreading requests
+over threads; the tree models release the GIL inside their C code.
+"""
+
+import gc
+import os
+
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+threads = 8
+preload_app = True
+timeout = 30
+
+
+def when_ready(server):
+    # The preloaded app is imported by now; freezing its objects keeps the
+    # workers' garbage collector from touching (and so copying) their pages
+    gc.freeze()
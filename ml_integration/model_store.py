@@ -0,0 +1,48 @@
+"""
+Model File Storage
+
+Saving and loading of the pickled model files shared by the training
+scripts and the APIs.
+
+joblib can only memory-map the numpy arrays (the tree nodes) of an
+uncompressed pickle, so each model family picks one or the other:
+
+- Pricing models are served by one gunicorn worker per core and stay
+  uncompressed, so the workers share the mapped pages.
+- The availability model is served by a single worker and is LZ4-compressed
+  when the lz4 package is installed (it is read into memory then), or
+  uncompressed and memory-mapped otherwise.
+"""
+
+import os
+
+import joblib
+
+PRICING_COMPRESSION = 0
+
+try:
+    import lz4  # noqa: F401 - enables joblib's lz4 compressor
+    AVAILABILITY_COMPRESSION = ('lz4', 3)
+except ImportError:
+    AVAILABILITY_COMPRESSION = 0
+
+
+def save_model_file(model_data, path, compress):
+    """Pickle model_data to path, replacing any existing file atomically."""
+    # Running APIs memory-map the file they loaded, and rewriting it in place
+    # kills them with SIGBUS. Renaming a new file over it leaves their
+    # mapping on the old inode instead.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        joblib.dump(model_data, tmp_path, compress=compress)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_model_file(path, compress):
+    """Load a file written by save_model_file with the same compress setting."""
+    # joblib warns and reads the whole file when asked to map a compressed one
+    return joblib.load(path, mmap_mode=None if compress else 'r')
@@ -9,20 +9,159 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import joblib
+from functools import lru_cache
 import os
+import queue
+import threading
+import time
 import traceback
 
+from config import ENABLE_CACHE
+from serving_utils import bucket, use_orjson
+from compiled_model import load_numba_regressor
+from derived_features import DERIVED_FEATURES
+from model_store import PRICING_COMPRESSION, load_model_file
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import cupy
+except ImportError:
+    cupy = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+use_orjson(app)
 
 # Load the trained model
 MODEL_PATH = 'parking_pricing_model_xgboost.pkl'  # Using XGBoost as default
 model = None
 model_metadata = None
 
+# Micro-batching of concurrent /api/predict-price requests: at most MAX_BATCH
+# rows per model call, holding a batch open at most MAX_WAIT_MS for requests
+# that are already being handled
+MAX_BATCH = int(os.environ.get('MAX_BATCH', 32))
+MAX_WAIT_MS = float(os.environ.get('MAX_WAIT_MS', 5))
+PREDICTION_TIMEOUT = 10.0  # seconds a request waits for its batch
+
+# Batches larger than this are scored on the GPU when one is available;
+# smaller ones stay on the CPU, where the host-device copy would dominate
+GPU_BATCH_THRESHOLD = int(os.environ.get('GPU_BATCH_THRESHOLD', 256))
+
+# Batches larger than this are split into shards of this many rows and scored
+# on a thread pool when the predictor is not XGBoost (XGBoost already spreads
+# a batch over all cores itself)
+PREDICT_SHARD_ROWS = 512
+_shard_pool = None
+
+# Prediction cache (enabled via config.ENABLE_CACHE); demand score and
+# occupancy rate are rounded to these steps to form the cache key
+PREDICTION_CACHE_SIZE = 8192
+DEMAND_BUCKET_STEP = 5
+OCCUPANCY_BUCKET_STEP = 0.05
+
+# /api/predict-price request body
+PREDICT_PRICE_REQUIRED_FIELDS = ['city', 'parking_type', 'base_price']
+PREDICT_PRICE_SCHEMA = {
+    'type': 'object',
+    'required': PREDICT_PRICE_REQUIRED_FIELDS,
+    'properties': {
+        'city': {'type': 'string'},
+        'area': {'type': 'string'},
+        'parking_type': {'type': 'string'},
+        'weather': {'type': 'string'},
+        'base_price': {'type': 'number'},
+        'demand_score': {'type': 'number'},
+        'occupancy_rate': {'type': 'number'},
+        'hour': {'type': 'number'},
+        'day_of_week': {'type': 'number'},
+        'month': {'type': 'number'},
+        'is_ev_charging': {'type': ['boolean', 'number']},
+        'is_handicap': {'type': ['boolean', 'number']},
+        'is_event': {'type': ['boolean', 'number']},
+        'is_weekend': {'type': ['boolean', 'number']}
+    }
+}
+# Compiled to a specialized Python function when fastjsonschema is installed
+_validate_price_request = fastjsonschema.compile(PREDICT_PRICE_SCHEMA) if fastjsonschema is not None else None
+
+# Request fields the model input is built from
+_CACHE_KEY_FIELDS = (
+    'city', 'area', 'parking_type', 'season', 'time_category', 'weather',
+    'hour', 'day_of_week', 'month', 'is_weekend', 'is_event',
+    'demand_score', 'occupancy_rate', 'base_price', 'is_ev_charging', 'is_handicap'
+)
+# Those of them that are label-encoded
+_CACHE_CATEGORICAL_FIELDS = ('city', 'area', 'parking_type', 'season', 'time_category', 'weather')
+
+# Cyclical encodings of the whole-number time fields, tabulated from the
+# training formulas. Other values (fractional or out of range) are computed
+# from the formula, as in training.
+_CYCLE_VALUES = {'hour': range(24), 'day_of_week': range(7), 'month': range(1, 13)}
+_CYCLE_TABLES = {
+    name: dict(zip(_CYCLE_VALUES[fields[0]], formula(np.array(_CYCLE_VALUES[fields[0]])).tolist()))
+    for name, (fields, formula) in DERIVED_FEATURES.items()
+    if len(fields) == 1 and fields[0] in _CYCLE_VALUES
+}
+
+# Demand score adjustments used by /api/calculate-demand(-batch)
+DEMAND_CITY_MULTIPLIERS = {
+    'Mumbai': 1.2,
+    'Delhi': 1.15,
+    'Bangalore': 1.1,
+    'Chennai': 1.0,
+    'Trichy': 0.9
+}
+
+DEMAND_TYPE_MULTIPLIERS = {
+    'airport': 1.3,
+    'commercial': 1.2,
+    'mall': 1.2,
+    'street': 1.0,
+    'residential': 0.8
+}
+
+# Peak hour multiplier per hour 0-23
+_DEMAND_HOUR_MULT = np.ones(24)
+_DEMAND_HOUR_MULT[7:10] = 1.3
+_DEMAND_HOUR_MULT[17:20] = 1.3
+_DEMAND_HOUR_MULT[12:14] = 1.1
+
+# Season per month (index 0 unused)
+_SEASON_BY_MONTH = (None, 'winter', 'winter', 'spring', 'spring', 'spring', 'monsoon',
+                    'monsoon', 'monsoon', 'autumn', 'autumn', 'autumn', 'winter')
+
+
+def cuda_available():
+    """Whether XGBoost can run inference on a CUDA device through CuPy."""
+    if cupy is None:
+        return False
+    try:
+        return cupy.cuda.runtime.getDeviceCount() > 0
+    except cupy.cuda.runtime.CUDARuntimeError:
+        return False
+
+
+def gpu_booster(booster):
+    """A copy of the booster placed on the GPU, or None without CUDA."""
+    if booster is None or not cuda_available():
+        return None
+    gpu = booster.copy()
+    gpu.set_param({'device': 'cuda'})
+    return gpu
+
 
 def load_model():
     """Load the trained model at startup."""
@@ -34,20 +173,41 @@ def load_model():
         return False
     
     try:
-        model_data = joblib.load(MODEL_PATH)
+        model_data = load_model_file(MODEL_PATH, PRICING_COMPRESSION)
         model = {
             'predictor': model_data['model'],
+            # XGBoost models are scored through the booster directly, skipping
+            # the sklearn wrapper and DMatrix construction
+            'booster': model_data['model'].get_booster() if hasattr(model_data['model'], 'get_booster') else None,
             'label_encoders': model_data['label_encoders'],
-            'scaler': model_data['scaler'],
+            # class -> code lookups, so encoding is a dict map instead of le.transform per row
+            'label_maps': {feature: {str(c): i for i, c in enumerate(le.classes_)}
+                           for feature, le in model_data['label_encoders'].items()},
+            # Same encoding as a pandas categorical, for whole batch columns
+            'cat_dtypes': {feature: pd.CategoricalDtype(categories=[str(c) for c in le.classes_])
+                           for feature, le in model_data['label_encoders'].items()},
             'feature_columns': model_data['feature_columns'],
+            'feature_index': {name: i for i, name in enumerate(model_data['feature_columns'])},
             'metadata': model_data.get('metadata', {})
         }
+        model['write_row'] = compile_row_writer(model['feature_columns'], model['label_maps'])
+        model['gpu_booster'] = gpu_booster(model['booster'])
+        # numba tree walk for single rows, where XGBoost's call overhead dominates
+        model['row_predictor'] = load_numba_regressor(model['booster'])
         model_metadata = model.get('metadata', {})
         
+        _predict_cached.cache_clear()
+        
+        # One dummy prediction runs the predictor's lazy initialization now,
+        # so with a preloading server it happens once before the fork
+        predict_prices(np.zeros((1, len(model['feature_columns'])), dtype=np.float32))
+        
         print(f"✓ Model loaded successfully: {MODEL_PATH}")
         print(f"✓ Model type: {model_metadata.get('model_type', 'unknown')}")
         print(f"✓ Trained at: {model_metadata.get('trained_at', 'unknown')}")
         print(f"✓ Test R²: {model_metadata.get('performance_metrics', {}).get('test_r2', 'unknown')}")
+        if model['gpu_booster'] is not None:
+            print(f"✓ GPU inference for batches over {GPU_BATCH_THRESHOLD} rows")
         
         return True
     except Exception as e:
@@ -63,6 +223,9 @@ def prepare_features(data, is_training=False):
     Args:
         data: Dictionary or DataFrame with input features
         is_training: Always False for API predictions
+    
+    Returns:
+        (n_rows, n_features) float32 array in feature_columns order
     """
     if isinstance(data, dict):
         df = pd.DataFrame([data])
@@ -74,52 +237,241 @@ def prepare_features(data, is_training=False):
     
     for feature in categorical_features:
         if feature in df.columns:
-            le = model['label_encoders'][feature]
-            # Handle unseen categories
-            df[feature + '_encoded'] = df[feature].apply(
-                lambda x: le.transform([str(x)])[0] if str(x) in le.classes_ else -1
-            )
+            # Category codes are the label encoding; unseen categories get -1
+            codes = df[feature].astype(str).astype(model['cat_dtypes'][feature]).cat.codes
+            df[feature + '_encoded'] = codes.astype(np.int32)
     
-    # Create time-based cyclical features
-    if 'hour' in df.columns:
-        df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-        df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
+    # Create time-based cyclical features and interaction terms
+    for name, (fields, formula) in DERIVED_FEATURES.items():
+        if all(field in df.columns for field in fields):
+            df[name] = formula(*(df[field].to_numpy(dtype=np.float64) for field in fields))
     
-    if 'day_of_week' in df.columns:
-        df['dow_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
-        df['dow_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
+    # Select only the features used in training, written by position
+    # straight into the model's float32 input
+    feature_cols = model['feature_columns']
+    X = np.zeros((len(df), len(feature_cols)), dtype=np.float32)  # 0 for missing features
+    
+    for i, col in enumerate(feature_cols):
+        if col in df.columns:
+            # A batch frame can hold mixed bool/int object columns
+            X[:, i] = df[col].to_numpy()
+    
+    return X
+
+
+def prepare_features_single(features):
+    """
+    prepare_features for a single feature dict, written straight into a
+    (1, n_features) float32 row in feature_columns order without pandas.
+    """
+    x = np.zeros((1, len(model['feature_index'])), dtype=np.float32)
+    write_feature_row(features, x[0])
+    return x
+
+
+def write_feature_row(features, row):
+    """Write one get_current_features dict into a zeroed float32 row in feature_columns order."""
+    model['write_row'](features, row)
+
+
+def _derived_expression(name, fields):
+    """Expression computing derived column name from ``features`` in the row writer."""
+    if name in _CYCLE_TABLES:
+        value = f'features[{fields[0]!r}]'
+        return f'(_table_{name}[{value}] if {value} in _table_{name} else _formula_{name}({value}))'
+    return f'_formula_{name}({", ".join(f"features[{field!r}]" for field in fields)})'
+
+
+# Model columns computed from request fields: column -> (fields it needs,
+# expression over ``features``)
+_DERIVED_FEATURES = {name: (fields, _derived_expression(name, fields))
+                     for name, (fields, _) in DERIVED_FEATURES.items()}
+
+
+def compile_row_writer(feature_columns, label_maps):
+    """
+    Generate a row writer specialized to the model's feature columns.
     
-    if 'month' in df.columns:
-        df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-        df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
+    The generated function is one assignment per column, in column order,
+    with presence checks only for request fields get_current_features does
+    not always fill in (e.g. area). A column whose fields are missing falls
+    back to a value passed under its own name, and otherwise stays 0.
+    """
+    always_present = set(defaults_from_now()) | {'time_category'}
+    derived = dict(_DERIVED_FEATURES)
+    namespace = {
+        **{f'_table_{name}': table for name, table in _CYCLE_TABLES.items()},
+        **{f'_formula_{name}': formula for name, (_, formula) in DERIVED_FEATURES.items()},
+    }
+    for feature, mapping in label_maps.items():
+        namespace[f'_map_{feature}'] = mapping
+        derived[feature + '_encoded'] = ((feature,), f'_map_{feature}.get(str(features[{feature!r}]), -1)')
     
-    # Feature engineering
-    if 'demand_score' in df.columns and 'occupancy_rate' in df.columns:
-        df['demand_occupancy_interaction'] = df['demand_score'] * df['occupancy_rate']
+    lines = ['def write_row(features, row):']
+    for i, name in enumerate(feature_columns):
+        fields, expression = derived.get(name, ((name,), f'features[{name!r}]'))
+        checks = [f'{field!r} in features' for field in fields if field not in always_present]
+        if not checks:
+            lines.append(f'    row[{i}] = {expression}')
+            continue
+        lines.append(f'    if {" and ".join(checks)}:')
+        lines.append(f'        row[{i}] = {expression}')
+        if fields != (name,):
+            lines.append(f'    elif {name!r} in features:')
+            lines.append(f'        row[{i}] = features[{name!r}]')
+    lines.append('    return row')
     
-    if 'is_weekend' in df.columns and 'hour' in df.columns:
-        df['weekend_evening'] = df['is_weekend'] * (df['hour'] >= 17).astype(int) * (df['hour'] <= 22).astype(int)
+    exec('\n'.join(lines), namespace)
+    return namespace['write_row']
+
+
+def predict_prices(X):
+    """Predicted prices for a prepared float32 feature array."""
+    if model['gpu_booster'] is not None and len(X) > GPU_BATCH_THRESHOLD:
+        return cupy.asnumpy(model['gpu_booster'].inplace_predict(cupy.asarray(X)))
     
-    # Select only the features used in training
-    feature_cols = model['feature_columns']
+    if len(X) == 1 and model['row_predictor'] is not None:
+        return np.array([model['row_predictor'].predict_row(np.ascontiguousarray(X[0], dtype=np.float32))])
     
-    # Ensure all required features exist
-    for col in feature_cols:
-        if col not in df.columns:
-            df[col] = 0  # Default value for missing features
+    booster = model['booster']
+    if booster is not None:
+        return booster.inplace_predict(np.asarray(X, dtype=np.float32))
+    if len(X) > PREDICT_SHARD_ROWS and (os.cpu_count() or 1) > 1:
+        # sklearn's tree code releases the GIL, so shards run in parallel
+        shards = np.array_split(X, -(-len(X) // PREDICT_SHARD_ROWS))
+        return np.concatenate(list(_get_shard_pool().map(_predict_sklearn, shards)))
+    return _predict_sklearn(X)
+
+
+def _predict_sklearn(X):
+    if isinstance(X, np.ndarray):
+        X = pd.DataFrame(X, columns=model['feature_columns'])
+    return model['predictor'].predict(X)
+
+
+def _get_shard_pool():
+    # Created on first use so a preloading WSGI server forks before its threads exist
+    global _shard_pool
+    if _shard_pool is None:
+        _shard_pool = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='price-shard')
+    return _shard_pool
+
+
+class _PendingPrediction:
+    """A queued single prediction and the slot its result is written to."""
+    __slots__ = ('features', 'enqueued_at', 'done', 'price', 'error')
     
-    return df[feature_cols]
+    def __init__(self, features):
+        self.features = features
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.price = None
+        self.error = None
 
 
-def get_current_features(data):
+class PredictionBatcher:
     """
-    Extract and compute current features from input data.
-    Auto-fills time-based features if not provided.
+    Coalesces concurrent single predictions into one model call.
+    
+    A background thread takes the oldest queued request and keeps the batch
+    open until MAX_WAIT_MS after it arrived, but only while more requests are
+    in flight than it has collected, so a lone request is never delayed.
+    Requests count as in flight while inside ``with batcher:``. Rows are
+    written into one reused (max_batch, n_features) buffer owned by the
+    worker thread.
     """
-    now = datetime.now()
     
-    # Default values
-    defaults = {
+    def __init__(self, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._thread = None
+        self._buffer = None
+    
+    def __enter__(self):
+        with self._lock:
+            self._active += 1
+        return self
+    
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self._active -= 1
+    
+    def predict(self, features, timeout=PREDICTION_TIMEOUT):
+        """Predicted price for one request's complete feature dict."""
+        self._ensure_worker()
+        pending = _PendingPrediction(features)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError('Prediction timed out')
+        if pending.error is not None:
+            raise pending.error
+        return pending.price
+    
+    def _ensure_worker(self):
+        # Started lazily so a preloading WSGI server forks before the thread exists
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='price-batcher', daemon=True)
+                    self._thread.start()
+    
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._active <= len(batch):
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _batch_matrix(self, batch):
+        n_features = len(model['feature_columns'])
+        if self._buffer is None or self._buffer.shape[1] != n_features:
+            self._buffer = np.zeros((self.max_batch, n_features), dtype=np.float32)
+        
+        X = self._buffer[:len(batch)]
+        X.fill(0)
+        for row, pending in zip(X, batch):
+            write_feature_row(pending.features, row)
+        return X
+    
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                X = self._batch_matrix(batch)
+                prices = predict_prices(X).tolist()
+                for pending, price in zip(batch, prices):
+                    pending.price = price
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
+
+
+batcher = PredictionBatcher()
+
+
+def defaults_from_now(now=None):
+    """Default feature values for a request handled at ``now``."""
+    if now is None:
+        now = datetime.now()
+    
+    return {
         'hour': now.hour,
         'day_of_week': now.weekday(),
         'month': now.month,
@@ -133,6 +485,20 @@ def get_current_features(data):
         'is_handicap': 0,
         'base_price': 20
     }
+
+
+def get_current_features(data, defaults=None):
+    """
+    Extract and compute current features from input data.
+    Auto-fills time-based features if not provided.
+    
+    Args:
+        data: Request features
+        defaults: Result of defaults_from_now(), to share one clock read
+            across the slots of a batch
+    """
+    if defaults is None:
+        defaults = defaults_from_now()
     
     # Merge with provided data
     features = {**defaults, **data}
@@ -153,14 +519,8 @@ def get_current_features(data):
 
 def get_season(month):
     """Determine season from month."""
-    if month in [12, 1, 2]:
-        return 'winter'
-    elif month in [3, 4, 5]:
-        return 'spring'
-    elif month in [6, 7, 8]:
-        return 'monsoon'
-    elif month in [9, 10, 11]:
-        return 'autumn'
+    if 1 <= month <= 12:
+        return _SEASON_BY_MONTH[month]
     return 'summer'
 
 
@@ -220,63 +580,8 @@ def predict_price():
         if model is None:
             return jsonify({'error': 'Model not loaded'}), 503
         
-        # Get request data
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        # Required fields
-        required_fields = ['city', 'parking_type', 'base_price']
-        missing_fields = [f for f in required_fields if f not in data]
-        
-        if missing_fields:
-            return jsonify({
-                'error': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
-        
-        # Get complete features with defaults
-        features = get_current_features(data)
-        
-        # Prepare features for model
-        X = prepare_features(features)
-        
-        # Make prediction
-        predicted_price = model['predictor'].predict(X)[0]
-        
-        # Calculate multiplier
-        base_price = features['base_price']
-        price_multiplier = predicted_price / base_price if base_price > 0 else 1.0
-        
-        # Determine confidence (based on typical price ranges)
-        if 0.5 <= price_multiplier <= 2.5:
-            confidence = 'high'
-        elif 0.3 <= price_multiplier <= 3.0:
-            confidence = 'medium'
-        else:
-            confidence = 'low'
-        
-        # Response
-        response = {
-            'predicted_price': round(predicted_price, 2),
-            'base_price': round(base_price, 2),
-            'price_multiplier': round(price_multiplier, 2),
-            'confidence': confidence,
-            'timestamp': datetime.now().isoformat(),
-            'features_used': {
-                'city': features['city'],
-                'parking_type': features['parking_type'],
-                'hour': features['hour'],
-                'day_of_week': features['day_of_week'],
-                'season': features['season'],
-                'demand_score': features['demand_score'],
-                'occupancy_rate': features['occupancy_rate'],
-                'weather': features['weather'],
-                'is_event': features['is_event']
-            }
-        }
-        
-        return jsonify(response)
+        with batcher:
+            return _predict_price(request.get_json())
     
     except Exception as e:
         print(f"Error in prediction: {e}")
@@ -287,6 +592,107 @@ def predict_price():
         }), 500
 
 
+def price_request_error(data):
+    """Error message for an invalid /api/predict-price body, or None if it is valid."""
+    schema_error = None
+    if _validate_price_request is not None:
+        try:
+            _validate_price_request(data)
+            return None
+        except fastjsonschema.JsonSchemaException as e:
+            schema_error = e.message
+    
+    # Report every missing required field, as before schema validation
+    missing_fields = [f for f in PREDICT_PRICE_REQUIRED_FIELDS if f not in data]
+    if missing_fields:
+        return f'Missing required fields: {", ".join(missing_fields)}'
+    return schema_error
+
+
+def _cache_key(features):
+    """
+    Hashable key of the model inputs, with demand and occupancy bucketed.
+    
+    Categorical fields are keyed by their string form, which is what the
+    label maps encode. Returns None (predict uncached) when some other value
+    cannot be bucketed or hashed.
+    """
+    try:
+        bucketed = dict(features,
+                        demand_score=bucket(features['demand_score'], DEMAND_BUCKET_STEP),
+                        occupancy_rate=bucket(features['occupancy_rate'], OCCUPANCY_BUCKET_STEP))
+        for name in _CACHE_CATEGORICAL_FIELDS:
+            if name in bucketed:
+                bucketed[name] = str(bucketed[name])
+        key = tuple((name, bucketed[name]) for name in _CACHE_KEY_FIELDS if name in bucketed)
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+@lru_cache(maxsize=PREDICTION_CACHE_SIZE)
+def _predict_cached(key):
+    """Cached predicted price for a discretized request."""
+    return batcher.predict(dict(key))
+
+
+def _predict_price(data):
+    """Validate, score (through the batcher) and format a single price request."""
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    # Required fields and value types
+    error = price_request_error(data)
+    if error is not None:
+        return jsonify({'error': error}), 400
+    
+    # Get complete features with defaults
+    features = get_current_features(data)
+    
+    # Make prediction (coalesced with concurrent requests)
+    key = _cache_key(features) if ENABLE_CACHE else None
+    if key is not None:
+        predicted_price = _predict_cached(key)
+    else:
+        predicted_price = batcher.predict(features)
+    
+    # Calculate multiplier
+    base_price = features['base_price']
+    price_multiplier = predicted_price / base_price if base_price > 0 else 1.0
+    
+    # Determine confidence (based on typical price ranges)
+    if 0.5 <= price_multiplier <= 2.5:
+        confidence = 'high'
+    elif 0.3 <= price_multiplier <= 3.0:
+        confidence = 'medium'
+    else:
+        confidence = 'low'
+    
+    # Response
+    response = {
+        'predicted_price': round(predicted_price, 2),
+        'base_price': round(base_price, 2),
+        'price_multiplier': round(price_multiplier, 2),
+        'confidence': confidence,
+        'timestamp': datetime.now().isoformat(),
+        'features_used': {
+            'city': features['city'],
+            'parking_type': features['parking_type'],
+            'hour': features['hour'],
+            'day_of_week': features['day_of_week'],
+            'season': features['season'],
+            'demand_score': features['demand_score'],
+            'occupancy_rate': features['occupancy_rate'],
+            'weather': features['weather'],
+            'is_event': features['is_event']
+        }
+    }
+    
+    return jsonify(response)
+
+
 @app.route('/api/batch-predict', methods=['POST'])
 def batch_predict():
     """
@@ -322,28 +728,31 @@ def batch_predict():
         slots = data['slots']
         common_features = data.get('common_features', {})
         
+        # Merge slot data with common features and complete the defaults
+        defaults = defaults_from_now()
+        rows = [get_current_features({**slot, **common_features}, defaults) for slot in slots]
+        
         predictions = []
         
-        for slot in slots:
-            # Merge slot data with common features
-            slot_features = {**slot, **common_features}
-            
-            # Get complete features
-            features = get_current_features(slot_features)
+        if rows:
+            # Prepare and predict the whole batch at once
+            X = prepare_features(pd.DataFrame(rows))
+            predicted_prices = predict_prices(X).astype(np.float64)
             
-            # Prepare and predict
-            X = prepare_features(features)
-            predicted_price = model['predictor'].predict(X)[0]
+            base_prices = np.array([features['base_price'] for features in rows], dtype=np.float64)
+            price_multipliers = np.divide(predicted_prices, base_prices,
+                                          out=np.ones_like(predicted_prices), where=base_prices > 0)
             
-            base_price = features['base_price']
-            price_multiplier = predicted_price / base_price if base_price > 0 else 1.0
-            
-            predictions.append({
-                'slot_id': slot.get('slot_id', 'unknown'),
-                'predicted_price': round(predicted_price, 2),
-                'base_price': round(base_price, 2),
-                'price_multiplier': round(price_multiplier, 2)
-            })
+            # Round the price columns in one pass each
+            for slot, features, predicted_price, price_multiplier in zip(
+                    slots, rows, np.round(predicted_prices, 2).tolist(),
+                    np.round(price_multipliers, 2).tolist()):
+                predictions.append({
+                    'slot_id': slot.get('slot_id', 'unknown'),
+                    'predicted_price': predicted_price,
+                    'base_price': round(features['base_price'], 2),
+                    'price_multiplier': price_multiplier
+                })
         
         return jsonify({
             'predictions': predictions,
@@ -418,24 +827,10 @@ def calculate_demand():
             demand_score *= 1.1
         
         # City multiplier
-        city_multipliers = {
-            'Mumbai': 1.2,
-            'Delhi': 1.15,
-            'Bangalore': 1.1,
-            'Chennai': 1.0,
-            'Trichy': 0.9
-        }
-        demand_score *= city_multipliers.get(city, 1.0)
+        demand_score *= DEMAND_CITY_MULTIPLIERS.get(city, 1.0)
         
         # Parking type multiplier
-        type_multipliers = {
-            'airport': 1.3,
-            'commercial': 1.2,
-            'mall': 1.2,
-            'street': 1.0,
-            'residential': 0.8
-        }
-        demand_score *= type_multipliers.get(parking_type, 1.0)
+        demand_score *= DEMAND_TYPE_MULTIPLIERS.get(parking_type, 1.0)
         
         # Clamp between 0 and 100
         demand_score = min(max(demand_score, 0), 100)
@@ -454,6 +849,118 @@ def calculate_demand():
         }), 500
 
 
+def demand_scores(available, total, recent_requests, hours, cities, parking_types):
+    """
+    Vectorized calculate_demand: demand scores and occupancy rates for
+    equal-length sequences of inputs.
+    
+    Returns:
+        (demand_score, occupancy_rate) float64 arrays
+    """
+    available = np.asarray(available, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
+    recent_requests = np.asarray(recent_requests, dtype=np.float64)
+    hours = np.asarray(hours, dtype=np.float64)
+    
+    # Divided and subtracted in place where total > 0; other slots keep 0.5
+    has_total = total > 0
+    occupancy_rate = np.full_like(total, 0.5)
+    np.divide(available, total, out=occupancy_rate, where=has_total)
+    np.subtract(1, occupancy_rate, out=occupancy_rate, where=has_total)
+    
+    # Peak hour boundaries are whole hours, so the floor indexes the table
+    # exactly; hours outside 0-23 get no adjustment
+    in_day = (hours >= 0) & (hours < 24)
+    hour_mult = np.where(in_day, _DEMAND_HOUR_MULT[np.where(in_day, hours, 0).astype(np.int64)], 1.0)
+    
+    city_mult = np.array([DEMAND_CITY_MULTIPLIERS.get(city, 1.0) for city in cities], dtype=np.float64)
+    type_mult = np.array([DEMAND_TYPE_MULTIPLIERS.get(t, 1.0) for t in parking_types], dtype=np.float64)
+    
+    return _demand_kernel(occupancy_rate, recent_requests, hour_mult, city_mult, type_mult), occupancy_rate
+
+
+def _demand_numpy(occupancy_rate, recent_requests, hour_mult, city_mult, type_mult):
+    """Clamped demand score from occupancy, recent requests and multipliers."""
+    demand_score = (occupancy_rate * 60) + (np.minimum(recent_requests, 50) * 0.8)
+    demand_score = demand_score * hour_mult * city_mult * type_mult
+    return np.clip(demand_score, 0, 100)
+
+
+def _demand_loop(occupancy_rate, recent_requests, hour_mult, city_mult, type_mult):
+    """_demand_numpy as a single fused pass, for numba to compile."""
+    out = np.empty(occupancy_rate.shape[0])
+    for i in range(occupancy_rate.shape[0]):
+        recent = recent_requests[i] if recent_requests[i] < 50 else 50.0
+        demand_score = (occupancy_rate[i] * 60) + (recent * 0.8)
+        demand_score = demand_score * hour_mult[i] * city_mult[i] * type_mult[i]
+        out[i] = 0.0 if demand_score < 0 else (100.0 if demand_score > 100 else demand_score)
+    return out
+
+
+if njit is not None:
+    _demand_kernel = njit(cache=True)(_demand_loop)
+    # Compile (or load from the cache) at import rather than on the first request
+    _demand_kernel(np.zeros(1), np.zeros(1), np.ones(1), np.ones(1), np.ones(1))
+else:
+    _demand_kernel = _demand_numpy
+
+
+@app.route('/api/calculate-demand-batch', methods=['POST'])
+def calculate_demand_batch():
+    """
+    Calculate demand scores for many slots in one call.
+    
+    Request:
+    {
+        "slots": [
+            {"slot_id": "Mumbai-Bandra-001", "city": "Mumbai", "parking_type": "commercial",
+             "available_slots": 50, "total_slots": 200, "recent_requests": 75, "hour": 18},
+            ...
+        ]
+    }
+    
+    Each slot takes the same fields and defaults as /api/calculate-demand.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'slots' not in data:
+            return jsonify({'error': 'No slots provided'}), 400
+        
+        slots = data['slots']
+        current_hour = datetime.now().hour
+        
+        demand, occupancy = demand_scores(
+            [slot.get('available_slots', 100) for slot in slots],
+            [slot.get('total_slots', 200) for slot in slots],
+            [slot.get('recent_requests', 0) for slot in slots],
+            [slot.get('hour', current_hour) for slot in slots],
+            [slot.get('city', 'Mumbai') for slot in slots],
+            [slot.get('parking_type', 'street') for slot in slots]
+        )
+        
+        results = []
+        for slot, demand_score, occupancy_rate in zip(slots, demand.tolist(), occupancy.tolist()):
+            results.append({
+                'slot_id': slot.get('slot_id', 'unknown'),
+                'demand_score': round(demand_score, 2),
+                'occupancy_rate': round(occupancy_rate, 2),
+                'demand_level': 'high' if demand_score > 70 else 'medium' if demand_score > 40 else 'low'
+            })
+        
+        return jsonify({
+            'results': results,
+            'total_slots': len(results)
+        })
+    
+    except Exception as e:
+        print(f"Error calculating demand: {e}")
+        return jsonify({
+            'error': 'Demand calculation failed',
+            'message': str(e)
+        }), 500
+
+
 if __name__ == '__main__':
     print("="*70)
     print("DYNAMIC PARKING PRICING API")
@@ -473,7 +980,13 @@ if __name__ == '__main__':
     print("  POST /api/predict-price       - Single price prediction")
     print("  POST /api/batch-predict       - Batch price predictions")
     print("  POST /api/calculate-demand    - Calculate demand score")
+    print("  POST /api/calculate-demand-batch - Batch demand scores")
     print("  GET  /api/model-info          - Model information")
+    print("\n  (for production: gunicorn -c gunicorn_conf.py -b 0.0.0.0:5000 pricing_api:app)")
     print("\n")
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
+else:
+    # Imported by a WSGI server (e.g. gunicorn with preload_app): load the
+    # model once at import so workers share it
+    load_model()
@@ -0,0 +1,36 @@
+"""
+Shared Serving Helpers
+
+Used by both the pricing and the availability API: an orjson-backed JSON
+provider for Flask (orjson is optional; without it Flask's default JSON
+handling is kept) and the rounding of numeric inputs into cache buckets.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, used by jsonify and request.get_json."""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def bucket(value, step):
+    """Round a numeric input to the nearest multiple of step (the cache bucket)."""
+    return round(step * round(value / step), 2)
+
+
+def use_orjson(app):
+    """Serve app's JSON through orjson when it is installed."""
+    if orjson is not None:
+        app.json = ORJSONProvider(app)
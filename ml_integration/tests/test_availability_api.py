@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import availability_api as api
+from availability_model import AvailabilityPredictor
+
+REQUEST = {'city': 'Chennai', 'area': 'Area-1', 'parking_type': 'mall',
+           'timestamp': '2025-11-07T14:30:00', 'is_ev_charging': True}
+
+
+def _train(tmp, n_areas, num_samples):
+    path = os.path.join(tmp, 'slots.json')
+    with open(path, 'w') as f:
+        json.dump([{'city': 'Chennai', 'area': f'Area-{i}', 'type': ('street', 'mall')[i % 2],
+                    'isEVCharging': i % 3 == 0, 'isHandicap': False, 'pricePerHour': 20.0 + i}
+                   for i in range(n_areas)], f)
+    predictor = AvailabilityPredictor()
+    predictor.train(predictor.generate_training_data(path, num_samples=num_samples, seed=0))
+    return predictor
+
+
+class ModelReloadTest(unittest.TestCase):
+    def setUp(self):
+        self._paths = api.AVAILABILITY_MODEL_PATH, api.AVAILABILITY_COMPILED_MODEL_PATH
+
+    def tearDown(self):
+        api.AVAILABILITY_MODEL_PATH, api.AVAILABILITY_COMPILED_MODEL_PATH = self._paths
+
+    def _predict(self):
+        api._predict_cached.cache_clear()
+        np.random.seed(0)
+        response = api.app.test_client().post('/api/predict-availability', json=REQUEST)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()['availability_probability']
+
+    def test_loaded_model_survives_retraining_over_its_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            api.AVAILABILITY_MODEL_PATH = os.path.join(tmp, 'model.pkl')
+            # Serve the memory-mapped pickle, not a Treelite-compiled copy
+            api.AVAILABILITY_COMPILED_MODEL_PATH = os.path.join(tmp, 'missing.so')
+            _train(tmp, n_areas=4, num_samples=3000).save(api.AVAILABILITY_MODEL_PATH)
+            self.assertTrue(api.load_availability_model())
+            before = self._predict()
+
+            # Retrain next to the running API, writing over the file it loaded
+            _train(tmp, n_areas=2, num_samples=500).save(api.AVAILABILITY_MODEL_PATH)
+
+            self.assertEqual(self._predict(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
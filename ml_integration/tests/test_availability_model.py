@@ -0,0 +1,50 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from availability_model import AvailabilityPredictor, HGB_MAX_CATEGORIES
+
+
+def _slots(n_areas):
+    return [{'city': 'Chennai', 'area': f'Area-{i}', 'type': ('street', 'mall')[i % 2],
+             'isEVCharging': i % 3 == 0, 'isHandicap': False, 'pricePerHour': 20.0 + i % 7}
+            for i in range(n_areas)]
+
+
+class TrainTest(unittest.TestCase):
+    def _training_data(self, n_areas, num_samples=3000):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'slots.json')
+            with open(path, 'w') as f:
+                json.dump(_slots(n_areas), f)
+            return AvailabilityPredictor().generate_training_data(path, num_samples=num_samples, seed=0)
+
+    def test_trains_with_more_areas_than_native_categories(self):
+        n_areas = HGB_MAX_CATEGORIES + 45
+        data = self._training_data(n_areas, num_samples=6000)
+        predictor = AvailabilityPredictor()
+        metrics = predictor.train(data)
+
+        self.assertEqual(len(predictor.label_encoders['area'].classes_), data['area'].nunique())
+        self.assertGreater(data['area'].nunique(), HGB_MAX_CATEGORIES)
+        categorical = set(predictor.model.feature_names_in_[predictor.model.is_categorical_])
+        self.assertNotIn('area_encoded', categorical)
+        self.assertIn('city_encoded', categorical)
+        self.assertGreater(metrics['test_accuracy'], 0.5)
+
+    def test_missing_categories_get_their_own_class(self):
+        data = self._training_data(4)
+        data.loc[data.index[:100], 'area'] = None
+        predictor = AvailabilityPredictor()
+        predictor.train(data)
+
+        self.assertIn('nan', predictor.label_encoders['area'].classes_)
+        self.assertEqual(predictor.label_encoders['area'].classes_.size, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import xgboost as xgb
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import compiled_model
+from compiled_model import load_numba_regressor
+
+
+def _rows(rng, n_rows, n_features):
+    X = rng.normal(size=(n_rows, n_features)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    return X
+
+
+@unittest.skipIf(compiled_model.njit is None, 'numba is not installed')
+class NumbaTreeRegressorTest(unittest.TestCase):
+    def test_matches_booster_on_random_rows(self):
+        rng = np.random.default_rng(0)
+        X = _rows(rng, 3000, 8)
+        y = np.nan_to_num(X[:, 0]) * 3 + np.nan_to_num(X[:, 1]) ** 2 + rng.normal(size=len(X))
+        booster = xgb.XGBRegressor(n_estimators=50, max_depth=6).fit(X, y).get_booster()
+
+        regressor = load_numba_regressor(booster)
+        self.assertIsNotNone(regressor)
+
+        X_test = _rows(rng, 2000, 8)
+        expected = booster.inplace_predict(X_test)
+        actual = np.array([regressor.predict_row(x) for x in X_test], dtype=np.float32)
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_other_objectives_are_left_to_xgboost(self):
+        rng = np.random.default_rng(0)
+        X = _rows(rng, 500, 4)
+        y = rng.poisson(3, size=len(X))
+        booster = xgb.XGBRegressor(n_estimators=5, objective='count:poisson').fit(X, y).get_booster()
+
+        self.assertIsNone(load_numba_regressor(booster))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import threading
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+
+ML_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ML_DIR)
+
+import pricing_api as api
+
+MODEL_FILE = os.path.join(ML_DIR, api.MODEL_PATH)
+
+REQUESTS = [
+    {'city': 'Mumbai', 'area': 'Bandra', 'parking_type': 'commercial', 'base_price': 25.0,
+     'is_ev_charging': True, 'hour': 18, 'day_of_week': 4, 'month': 11},
+    {'city': 'Delhi', 'parking_type': 'mall', 'base_price': 40, 'demand_score': 80,
+     'occupancy_rate': 0.9, 'weather': 'rainy', 'hour': 9, 'day_of_week': 5, 'is_weekend': 1},
+    {'city': 'Nowhere', 'area': 'X', 'parking_type': 'residential', 'base_price': 15,
+     'weather': 'foggy', 'hour': 2, 'is_event': True},
+    # Fractional and out-of-range time fields
+    {'city': 'Chennai', 'parking_type': 'street', 'base_price': 30, 'hour': 18.5,
+     'day_of_week': 7, 'month': 13, 'is_weekend': True},
+]
+
+
+def setUpModule():
+    if not os.path.exists(MODEL_FILE):
+        raise unittest.SkipTest(f'{MODEL_FILE} not trained')
+    if api.model is None:
+        api.MODEL_PATH = MODEL_FILE
+        api.load_model()
+
+
+def _features(data):
+    return api.get_current_features(data, api.defaults_from_now(datetime(2025, 6, 7, 14, 30)))
+
+
+class RowWriterTest(unittest.TestCase):
+    def test_matches_prepare_features(self):
+        for data in REQUESTS:
+            with self.subTest(data=data):
+                features = _features(data)
+                np.testing.assert_array_equal(api.prepare_features_single(features),
+                                              api.prepare_features(features))
+
+
+class PredictionBatcherTest(unittest.TestCase):
+    def test_concurrent_requests_get_their_own_price(self):
+        n_threads = 24
+        rows = [_features(dict(REQUESTS[i % len(REQUESTS)], base_price=10 + i, hour=i % 24))
+                for i in range(n_threads)]
+        expected = [float(api.predict_prices(api.prepare_features_single(f))[0]) for f in rows]
+
+        batch_sizes = []
+        predict_prices = api.predict_prices
+
+        def recording_predict_prices(X):
+            batch_sizes.append(len(X))
+            return predict_prices(X)
+
+        batcher = api.PredictionBatcher(max_batch=8, max_wait_ms=200)
+        barrier = threading.Barrier(n_threads)
+        prices = [None] * n_threads
+
+        def request(i):
+            with batcher:
+                barrier.wait()
+                prices[i] = batcher.predict(rows[i])
+
+        with mock.patch.object(api, 'predict_prices', recording_predict_prices):
+            threads = [threading.Thread(target=request, args=(i,)) for i in range(n_threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        for price, want in zip(prices, expected):
+            self.assertAlmostEqual(price, want, places=4)
+        self.assertEqual(sum(batch_sizes), n_threads)
+        self.assertGreater(max(batch_sizes), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,16 +16,103 @@ The model considers:
 
 import pandas as pd
 import numpy as np
-import joblib
 import json
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from threadpoolctl import threadpool_limits
+from sklearn.preprocessing import LabelEncoder
 import xgboost as xgb
-import matplotlib.pyplot as plt
-import seaborn as sns
+from derived_features import DERIVED_FEATURES
+from model_store import PRICING_COMPRESSION, load_model_file, save_model_file
+
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# The derived-feature formulas as parallel numba kernels over whole columns.
+# No fastmath: the features must match the pricing API's numpy encodings.
+_DERIVED_KERNELS = {
+    name: njit(parallel=True, cache=True)(formula) for name, (_, formula) in DERIVED_FEATURES.items()
+} if njit is not None else {}
+
+
+# 0/1 input columns passed through to the feature matrix
+_INDICATOR_COLUMNS = ('is_weekend', 'is_ev_charging', 'is_handicap', 'is_event')
+
+# Random forest growth: trees added per batch, upper bound, and the smallest
+# out-of-bag R² gain that keeps it growing
+RF_TREE_BATCH = 50
+RF_MAX_TREES = 200
+RF_OOB_MIN_GAIN = 1e-3
+
+# Test samples drawn in the performance scatter plots
+PLOT_MAX_POINTS = 20000
+
+def _residual_sums_loop(y, y_pred):
+    """Squared, absolute and relative error sums plus the sums of y - y[0] and its square."""
+    sum_sq = 0.0
+    sum_abs = 0.0
+    sum_abs_pct = 0.0
+    sum_d = 0.0
+    sum_d_sq = 0.0
+    for i in prange(y.shape[0]):
+        r = y[i] - y_pred[i]
+        sum_sq += r * r
+        sum_abs += abs(r)
+        sum_abs_pct += abs(r / y[i])
+        # Shifted by y[0] so the total sum of squares does not cancel
+        d = y[i] - y[0]
+        sum_d += d
+        sum_d_sq += d * d
+    return sum_sq, sum_abs, sum_abs_pct, sum_d, sum_d_sq
+
+
+_residual_sums = njit(parallel=True, cache=True)(_residual_sums_loop) if njit is not None else None
+
+
+def regression_metrics(y_true, y_pred):
+    """RMSE, MAE, R² and MAPE (%) of a prediction, from one pass over the residuals."""
+    y = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    
+    if _residual_sums is not None:
+        sum_sq, sum_abs, sum_abs_pct, sum_d, sum_d_sq = _residual_sums(y, y_pred)
+    else:
+        r = y - y_pred
+        d = y - y[0]
+        sum_sq, sum_abs, sum_abs_pct = np.dot(r, r), np.abs(r).sum(), np.abs(r / y).sum()
+        sum_d, sum_d_sq = d.sum(), np.dot(d, d)
+    
+    n = len(y)
+    ss_tot = sum_d_sq - sum_d * sum_d / n
+    return {
+        'rmse': np.sqrt(sum_sq / n),
+        'mae': sum_abs / n,
+        'r2': 1 - sum_sq / ss_tot,
+        'mape': sum_abs_pct / n * 100,
+    }
+
+
+def xgboost_device():
+    """'cuda' when XGBoost can train on a GPU on this machine, else 'cpu'."""
+    if not xgb.build_info().get('USE_CUDA'):
+        return 'cpu'
+    
+    # Without a visible GPU XGBoost quietly falls back to the CPU, so train a
+    # one-round probe and read back the device it actually used
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        probe = xgb.train({'device': 'cuda', 'tree_method': 'hist'},
+                          xgb.DMatrix(np.zeros((2, 1)), label=[0, 1]), num_boost_round=1)
+    device = json.loads(probe.save_config())['learner']['generic_param'].get('device', 'cpu')
+    return 'cuda' if device.startswith('cuda') else 'cpu'
 
 
 class PricingModel:
@@ -33,7 +120,8 @@ class PricingModel:
         """Initialize the pricing model."""
         self.model = None
         self.label_encoders = {}
-        self.scaler = StandardScaler()
+        self._class_maps = {}  # feature -> {class: code}, built from label_encoders on first use
+        self._booster = None  # Booster of an XGBoost model, for inplace_predict
         self.feature_importance = None
         self.feature_columns = None
         self.model_metadata = {
@@ -51,7 +139,8 @@ class PricingModel:
             df: DataFrame with raw features
             is_training: Whether this is training data (fit encoders) or prediction (transform only)
         """
-        df = df.copy()
+        # New columns are collected here rather than added to a copy of df
+        derived = {}
         
         # Categorical features to encode
         categorical_features = ['city', 'parking_type', 'season', 'time_category', 'weather', 'area']
@@ -60,37 +149,21 @@ class PricingModel:
         for feature in categorical_features:
             if feature in df.columns:
                 if is_training:
-                    self.label_encoders[feature] = LabelEncoder()
-                    df[feature + '_encoded'] = self.label_encoders[feature].fit_transform(df[feature].astype(str))
+                    # Hash-based factorization; the sorted categories give the
+                    # same codes as LabelEncoder.fit_transform
+                    cat = pd.Categorical(df[feature].astype(str))
+                    le = LabelEncoder()
+                    le.classes_ = np.asarray(cat.categories, dtype=object)
+                    self.label_encoders[feature] = le
+                    self._class_maps[feature] = {c: i for i, c in enumerate(le.classes_)}
+                    derived[feature + '_encoded'] = cat.codes.astype(np.int32)
                 else:
                     # Handle unseen categories
-                    le = self.label_encoders[feature]
-                    df[feature + '_encoded'] = df[feature].apply(
-                        lambda x: le.transform([str(x)])[0] if str(x) in le.classes_ else -1
-                    )
-        
-        # Create time-based features
-        if 'hour' in df.columns:
-            # Cyclical encoding for hour (24-hour cycle)
-            df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-            df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
-        
-        if 'day_of_week' in df.columns:
-            # Cyclical encoding for day of week (7-day cycle)
-            df['dow_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
-            df['dow_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
-        
-        if 'month' in df.columns:
-            # Cyclical encoding for month (12-month cycle)
-            df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-            df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
-        
-        # Feature engineering: interaction terms
-        if 'demand_score' in df.columns and 'occupancy_rate' in df.columns:
-            df['demand_occupancy_interaction'] = df['demand_score'] * df['occupancy_rate']
-        
-        if 'is_weekend' in df.columns and 'hour' in df.columns:
-            df['weekend_evening'] = df['is_weekend'] * (df['hour'] >= 17).astype(int) * (df['hour'] <= 22).astype(int)
+                    mapping = self._class_map(feature)
+                    derived[feature + '_encoded'] = df[feature].astype(str).map(mapping).fillna(-1).astype(np.int32)
+        
+        # Create time-based features and interaction terms
+        self._add_derived_features(df, derived)
         
         # Select final features for model
         feature_cols = [
@@ -113,75 +186,132 @@ class PricingModel:
         ]
         
         # Filter only existing columns
-        feature_cols = [col for col in feature_cols if col in df.columns]
+        feature_cols = [col for col in feature_cols if col in derived or col in df.columns]
         
         if is_training:
             self.feature_columns = feature_cols
         
-        return df[feature_cols]
+        # 0/1 indicators are held as int8 rather than int64 (or bool)
+        for col in _INDICATOR_COLUMNS:
+            if col in df.columns and col not in derived and (
+                    pd.api.types.is_bool_dtype(df[col]) or pd.api.types.is_integer_dtype(df[col])):
+                derived[col] = df[col].to_numpy(dtype=np.int8)
+        
+        return pd.DataFrame({col: derived[col] if col in derived else df[col] for col in feature_cols},
+                            index=df.index)
+    
+    def _class_map(self, feature):
+        """Class -> code lookup of a fitted label encoder."""
+        mapping = self._class_maps.get(feature)
+        if mapping is None:
+            le = self.label_encoders[feature]
+            mapping = self._class_maps[feature] = {str(c): i for i, c in enumerate(le.classes_)}
+        return mapping
     
-    def train(self, df, model_type='xgboost', test_size=0.2):
+    def _add_derived_features(self, df, derived):
+        """Compute the cyclical time encodings and interaction terms of df into derived."""
+        for name, (fields, formula) in DERIVED_FEATURES.items():
+            if all(field in df.columns for field in fields):
+                formula = _DERIVED_KERNELS.get(name, formula)
+                derived[name] = formula(*(df[field].to_numpy(dtype=np.float64) for field in fields))
+        
+        if 'weekend_evening' in derived:
+            derived['weekend_evening'] = derived['weekend_evening'].astype(np.int8)
+    
+    def prepare_training_features(self, df):
+        """Fit the encoders on df and return its training feature matrix."""
+        # Cast once up front to halve the in-memory matrix instead of keeping
+        # int64/float64. The random forest and XGBoost work in float32 anyway,
+        # but HistGradientBoostingRegressor bins in float64, so this changes
+        # the model it learns: float32 is the required inference dtype for
+        # every model, and float64 inputs can diverge from it.
+        return self.prepare_features(df, is_training=True).astype(np.float32)
+    
+    def split_training_data(self, df, test_size=0.2):
+        """Prepare df's features and labels and return (X_train, X_test, y_train, y_test)."""
+        X = self.prepare_training_features(df)
+        y = df['dynamic_price']
+        return train_test_split(X, y, test_size=test_size, random_state=42)
+    
+    def train(self, df, model_type='xgboost', test_size=0.2, splits=None, n_jobs=-1):
         """
         Train the pricing model.
         
         Args:
-            df: Training data DataFrame
+            df: Training data DataFrame (unused when splits is given)
             model_type: 'random_forest', 'gradient_boosting', or 'xgboost'
             test_size: Proportion of data to use for testing
+            splits: Result of split_training_data(df, test_size) for this
+                    model's encoders, if already computed
+            n_jobs: Threads for training (-1: all cores)
         """
         print(f"\n{'='*60}")
         print(f"TRAINING {model_type.upper()} MODEL")
         print(f"{'='*60}\n")
         
-        # Prepare features
-        X = self.prepare_features(df, is_training=True)
-        y = df['dynamic_price']
-        
-        print(f"Total samples: {len(X)}")
-        print(f"Features: {len(X.columns)}")
-        print(f"Feature names: {list(X.columns)}\n")
+        # Prepare features and split data
+        if splits is None:
+            splits = self.split_training_data(df, test_size)
+        X_train, X_test, y_train, y_test = splits
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=42
-        )
+        print(f"Total samples: {len(X_train) + len(X_test)}")
+        print(f"Features: {len(X_train.columns)}")
+        print(f"Feature names: {list(X_train.columns)}\n")
         
         print(f"Training samples: {len(X_train)}")
         print(f"Testing samples: {len(X_test)}\n")
         
-        # Scale features (optional, but helps some models)
-        # X_train_scaled = self.scaler.fit_transform(X_train)
-        # X_test_scaled = self.scaler.transform(X_test)
+        # Training-set metrics, when the fit already produced them
+        train_metrics = None
         
         # Train model based on type
         if model_type == 'random_forest':
             print("Training Random Forest...")
             self.model = RandomForestRegressor(
-                n_estimators=200,
+                n_estimators=RF_TREE_BATCH,
                 max_depth=20,
                 min_samples_split=5,
                 min_samples_leaf=2,
+                oob_score=True,
+                warm_start=True,
                 random_state=42,
-                n_jobs=-1,
+                n_jobs=n_jobs,
                 verbose=1
             )
+            # Grow the forest in batches (up to RF_MAX_TREES) until the
+            # out-of-bag R² stops improving
             self.model.fit(X_train, y_train)
+            while self.model.n_estimators < RF_MAX_TREES:
+                previous_oob = self.model.oob_score_
+                self.model.n_estimators += RF_TREE_BATCH
+                self.model.fit(X_train, y_train)
+                if self.model.oob_score_ - previous_oob < RF_OOB_MIN_GAIN:
+                    break
+            print(f"Random Forest: {self.model.n_estimators} trees (OOB R² {self.model.oob_score_:.4f})")
         
         elif model_type == 'gradient_boosting':
-            print("Training Gradient Boosting...")
-            self.model = GradientBoostingRegressor(
-                n_estimators=200,
+            # Histogram-based: binned split finding like XGBoost's hist,
+            # parallel over features with OpenMP
+            print("Training Histogram Gradient Boosting...")
+            self.model = HistGradientBoostingRegressor(
+                max_iter=200,
                 learning_rate=0.1,
                 max_depth=7,
-                min_samples_split=5,
+                min_samples_leaf=5,
+                early_stopping=True,
                 random_state=42,
                 verbose=1
             )
-            self.model.fit(X_train, y_train)
+            # OpenMP threads are not an estimator parameter; cap them here
+            with threadpool_limits(limits=n_jobs if n_jobs > 0 else None, user_api='openmp'):
+                self.model.fit(X_train, y_train)
         
         elif model_type == 'xgboost':
-            print("Training XGBoost...")
+            device = xgboost_device()
+            print(f"Training XGBoost (device: {device})...")
             self.model = xgb.XGBRegressor(
+                tree_method='hist',
+                device=device,
                 n_estimators=200,
                 learning_rate=0.1,
                 max_depth=7,
@@ -190,30 +320,45 @@ class PricingModel:
                 subsample=0.8,
                 colsample_bytree=0.8,
                 objective='reg:squarederror',
+                eval_metric=['rmse', 'mae', 'mape'],
                 random_state=42,
-                n_jobs=-1,
+                n_jobs=n_jobs,
                 verbosity=1
             )
-            self.model.fit(X_train, y_train)
+            # XGBoost stores labels as float32: hand them over as such instead
+            # of having the float64 series converted into a hidden copy
+            label = y_train.to_numpy(dtype=np.float32)
+            # Evaluating the training set each round reuses XGBoost's cached
+            # predictions (the eval pair must be the same objects as the
+            # training pair), so no second pass over X_train is needed afterwards
+            self.model.fit(X_train, label, eval_set=[(X_train, label)], verbose=False)
+            history = self.model.evals_result_['validation_0']
+            train_metrics = {
+                'rmse': history['rmse'][-1],
+                'mae': history['mae'][-1],
+                'r2': 1 - history['rmse'][-1] ** 2 / np.var(y_train),
+                'mape': history['mape'][-1] * 100,
+            }
+            # The saved model is served from CPU-only API workers. Set directly:
+            # set_params() would push the eval_metric list to the booster,
+            # which only accepts one metric per set_param call
+            self.model.device = 'cpu'
+            self.model.get_booster().set_param({'device': 'cpu'})
         
         else:
             raise ValueError(f"Unknown model type: {model_type}")
         
+        self._booster = self.model.get_booster() if model_type == 'xgboost' else None
+        
         # Make predictions
-        y_train_pred = self.model.predict(X_train)
+        if train_metrics is None:
+            train_metrics = regression_metrics(y_train, self.model.predict(X_train))
         y_test_pred = self.model.predict(X_test)
         
-        # Calculate metrics
-        train_rmse = np.sqrt(mean_squared_error(y_train, y_train_pred))
-        test_rmse = np.sqrt(mean_squared_error(y_test, y_test_pred))
-        train_mae = mean_absolute_error(y_train, y_train_pred)
-        test_mae = mean_absolute_error(y_test, y_test_pred)
-        train_r2 = r2_score(y_train, y_train_pred)
-        test_r2 = r2_score(y_test, y_test_pred)
-        
-        # Calculate MAPE (Mean Absolute Percentage Error)
-        train_mape = np.mean(np.abs((y_train - y_train_pred) / y_train)) * 100
-        test_mape = np.mean(np.abs((y_test - y_test_pred) / y_test)) * 100
+        # Calculate metrics, including MAPE (Mean Absolute Percentage Error)
+        test_metrics = regression_metrics(y_test, y_test_pred)
+        train_rmse, train_mae, train_r2, train_mape = (train_metrics[k] for k in ('rmse', 'mae', 'r2', 'mape'))
+        test_rmse, test_mae, test_r2, test_mape = (test_metrics[k] for k in ('rmse', 'mae', 'r2', 'mape'))
         
         # Store metrics
         self.model_metadata = {
@@ -250,7 +395,7 @@ class PricingModel:
         # Feature importance
         if hasattr(self.model, 'feature_importances_'):
             self.feature_importance = pd.DataFrame({
-                'feature': X.columns,
+                'feature': X_train.columns,
                 'importance': self.model.feature_importances_
             }).sort_values('importance', ascending=False)
             
@@ -267,10 +412,20 @@ class PricingModel:
     
     def _plot_results(self, y_true, y_pred, model_type):
         """Create visualization of model performance."""
+        # Imported here so loading a model for prediction does not pay for it
+        import matplotlib.pyplot as plt
+        
         fig, axes = plt.subplots(2, 2, figsize=(15, 12))
         
+        # The scatter plots show a fixed-seed sample of large test sets, so
+        # savefig does not draw every point
+        y_true_points, y_pred_points = np.asarray(y_true), np.asarray(y_pred)
+        if len(y_true_points) > PLOT_MAX_POINTS:
+            idx = np.random.default_rng(0).choice(len(y_true_points), PLOT_MAX_POINTS, replace=False)
+            y_true_points, y_pred_points = y_true_points[idx], y_pred_points[idx]
+        
         # 1. Actual vs Predicted
-        axes[0, 0].scatter(y_true, y_pred, alpha=0.5, s=20)
+        axes[0, 0].scatter(y_true_points, y_pred_points, alpha=0.5, s=20)
         axes[0, 0].plot([y_true.min(), y_true.max()], [y_true.min(), y_true.max()], 'r--', lw=2)
         axes[0, 0].set_xlabel('Actual Price (₹)', fontsize=12)
         axes[0, 0].set_ylabel('Predicted Price (₹)', fontsize=12)
@@ -278,8 +433,8 @@ class PricingModel:
         axes[0, 0].grid(True, alpha=0.3)
         
         # 2. Residuals
-        residuals = y_true - y_pred
-        axes[0, 1].scatter(y_pred, residuals, alpha=0.5, s=20)
+        residuals = y_true_points - y_pred_points
+        axes[0, 1].scatter(y_pred_points, residuals, alpha=0.5, s=20)
         axes[0, 1].axhline(y=0, color='r', linestyle='--', lw=2)
         axes[0, 1].set_xlabel('Predicted Price (₹)', fontsize=12)
         axes[0, 1].set_ylabel('Residuals (₹)', fontsize=12)
@@ -306,7 +461,7 @@ class PricingModel:
             axes[1, 1].grid(True, alpha=0.3, axis='x')
         
         plt.tight_layout()
-        plt.savefig(f'pricing_model_{model_type}_performance.png', dpi=300, bbox_inches='tight')
+        plt.savefig(f'pricing_model_{model_type}_performance.png', dpi=150, bbox_inches='tight')
         print(f"Performance plot saved: pricing_model_{model_type}_performance.png\n")
         plt.close()
     
@@ -318,28 +473,61 @@ class PricingModel:
             input_data: DataFrame or dict with required features
         """
         if isinstance(input_data, dict):
+            # Encode the row directly; the DataFrame pipeline is only needed
+            # when some raw input is missing
+            row = np.empty((1, len(self.feature_columns)), dtype=np.float32)
+            if self._encode_row(input_data, row[0]):
+                return self.predict_batch(row)
             input_data = pd.DataFrame([input_data])
         
-        # Prepare features
-        X = self.prepare_features(input_data, is_training=False)
+        # Prepare features, as float32 like the training matrix
+        X = self.prepare_features(input_data, is_training=False).astype(np.float32)
         
         # Make prediction
         predictions = self.model.predict(X)
         
         return predictions
     
+    def predict_batch(self, X):
+        """
+        Make price predictions for an already prepared feature matrix.
+        
+        Args:
+            X: float32 array with columns in self.feature_columns order
+        """
+        if self._booster is not None:
+            # Straight from the numpy buffer, without the sklearn wrapper's checks
+            return self._booster.inplace_predict(np.ascontiguousarray(X, dtype=np.float32))
+        # The sklearn models were fitted with feature names
+        return self.model.predict(pd.DataFrame(X, columns=self.feature_columns))
+    
+    def _encode_row(self, features, out):
+        """Fill out with the feature row of a dict of raw inputs; False if any input is missing."""
+        try:
+            for i, column in enumerate(self.feature_columns):
+                if column.endswith('_encoded'):
+                    feature = column[:-len('_encoded')]
+                    out[i] = self._class_map(feature).get(str(features[feature]), -1)
+                elif column in DERIVED_FEATURES:
+                    fields, formula = DERIVED_FEATURES[column]
+                    out[i] = formula(*(features[field] for field in fields))
+                else:
+                    out[i] = features[column]
+        except KeyError:
+            return False
+        return True
+    
     def save_model(self, filename='parking_pricing_model.pkl'):
         """Save the trained model and preprocessing objects."""
         model_data = {
             'model': self.model,
             'label_encoders': self.label_encoders,
-            'scaler': self.scaler,
             'feature_columns': self.feature_columns,
             'feature_importance': self.feature_importance,
             'metadata': self.model_metadata
         }
         
-        joblib.dump(model_data, filename)
+        save_model_file(model_data, filename, PRICING_COMPRESSION)
         print(f"Model saved to: {filename}")
         
         # Save metadata separately as JSON
@@ -351,12 +539,13 @@ class PricingModel:
     @classmethod
     def load_model(cls, filename='parking_pricing_model.pkl'):
         """Load a trained model."""
-        model_data = joblib.load(filename)
+        model_data = load_model_file(filename, PRICING_COMPRESSION)
         
         instance = cls()
         instance.model = model_data['model']
+        if isinstance(instance.model, xgb.XGBRegressor):
+            instance._booster = instance.model.get_booster()
         instance.label_encoders = model_data['label_encoders']
-        instance.scaler = model_data['scaler']
         instance.feature_columns = model_data['feature_columns']
         instance.feature_importance = model_data.get('feature_importance')
         instance.model_metadata = model_data.get('metadata', {})
@@ -368,21 +557,56 @@ class PricingModel:
         return instance
 
 
-def compare_models(df):
-    """Train and compare multiple model types."""
+def _train_and_save(model_type, splits, prepared, n_jobs=-1):
+    """Train one model type on data split by another model, save it and return its metrics."""
+    print(f"\n\n{'#'*70}")
+    print(f"# Training {model_type.upper()}")
+    print(f"{'#'*70}\n")
+    
+    model = PricingModel()
+    model.label_encoders = prepared.label_encoders
+    model._class_maps = prepared._class_maps
+    model.feature_columns = prepared.feature_columns
+    metadata = model.train(None, model_type=model_type, splits=splits, n_jobs=n_jobs)
+    model.save_model(f'parking_pricing_model_{model_type}.pkl')
+    
+    return metadata['performance_metrics']
+
+
+def compare_models(df, max_workers=None):
+    """
+    Train and compare multiple model types.
+    
+    Args:
+        df: Training data DataFrame
+        max_workers: Model types trained concurrently, one process each
+                     (default: one per model type, at most one per core)
+    """
     model_types = ['random_forest', 'xgboost', 'gradient_boosting']
-    results = {}
+    cores = os.cpu_count() or 1
+    if max_workers is None:
+        max_workers = min(len(model_types), cores)
     
-    for model_type in model_types:
-        print(f"\n\n{'#'*70}")
-        print(f"# Training {model_type.upper()}")
-        print(f"{'#'*70}\n")
-        
-        model = PricingModel()
-        metadata = model.train(df, model_type=model_type)
-        model.save_model(f'parking_pricing_model_{model_type}.pkl')
-        
-        results[model_type] = metadata['performance_metrics']
+    # The features and the seeded split only depend on df: compute them once
+    # and share the fitted encoders and splits with every model
+    prepared = PricingModel()
+    splits = prepared.split_training_data(df)
+    
+    if max_workers <= 1:
+        results = {model_type: _train_and_save(model_type, splits, prepared) for model_type in model_types}
+    else:
+        # The runs are independent, so the wall time is the slowest run
+        # rather than the sum. Split the cores between the processes to
+        # avoid oversubscription. Workers are not forked from this
+        # process directly: that copies the thread pools of numba and the
+        # native libraries and can hang on exit
+        n_jobs = max(1, cores // max_workers)
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        context = multiprocessing.get_context(start_method)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+            futures = {model_type: pool.submit(_train_and_save, model_type, splits, prepared, n_jobs)
+                       for model_type in model_types}
+            results = {model_type: future.result() for model_type, future in futures.items()}
     
     # Print comparison
     print(f"\n\n{'='*70}")